@@ -0,0 +1,1336 @@
+import html
+from PyQt6.QtWidgets import (
+    QMainWindow, QWidget, QTabWidget, 
+    QVBoxLayout, QHBoxLayout, QFormLayout,
+    QLabel, QLineEdit, QTextEdit, QPushButton, 
+    QDateEdit, QDateTimeEdit, QTableView, QHeaderView, QStyledItemDelegate,
+    QDialog, QMessageBox, QComboBox, QProgressDialog,
+    QGroupBox, QSplitter
+)
+from PyQt6.QtCore import (
+    Qt, QDate, QDateTime, QSize, QTimer, QAbstractTableModel, QModelIndex,
+    QSortFilterProxyModel, QObject, QRunnable, QThreadPool, QSignalBlocker,
+    pyqtSignal
+)
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
+
+# Importing styles
+from styles import APP_STYLE, PATIENT_FORM_NAME, TREATMENT_DETAILS_NAME
+
+# Item roles, resolved once instead of on every data() call
+DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+USER_ROLE = Qt.ItemDataRole.UserRole
+
+# Application-wide font, set once on the QApplication and inherited by every widget
+APP_FONT_FAMILY = "Segoe UI"
+APP_FONT_SIZE = 9
+
+# Size of every table row and default column width, in pixels
+ROW_HEIGHT = 28
+COLUMN_WIDTH = 120
+
+# Medical history records fetched per page
+HISTORY_PAGE_SIZE = 50
+
+# Rich-text templates for the treatment details view
+TREATMENT_DETAILS_TEMPLATE = """<h2>Treatment Details</h2>
+<p><b>Condition:</b> {condition}</p>
+<p><b>Symptoms:</b> {symptoms}</p>
+<p><b>Status:</b> {status}</p>
+<p><b>Created:</b> {created_at}</p>
+
+<h3>AI Analysis</h3>
+<div>
+{analysis}
+</div>
+
+<h3>Treatment Plan</h3>
+<div>
+{plan}
+</div>
+"""
+
+AI_RESULTS_TEMPLATE = """<h2>AI Analysis Results</h2>
+
+<h3>Symptom Analysis</h3>
+<div>
+{analysis}
+</div>
+
+<h3>Treatment Plan</h3>
+<div>
+{plan}
+</div>
+"""
+
+def html_text(value):
+    """Escape a value for interpolation into rich text, keeping its line breaks"""
+    return html.escape(str(value)).replace('\n', '<br>')
+
+def render_ai_results(ai_analysis, treatment_plan):
+    """Render the AI output of a newly added treatment (safe to call off the GUI thread)"""
+    return AI_RESULTS_TEMPLATE.format(
+        analysis=html_text(ai_analysis.get('analysis', 'No analysis available')),
+        plan=html_text(treatment_plan.get('treatment_plan', 'No treatment plan available'))
+    )
+
+class WorkerSignals(QObject):
+    """Signals emitted by a background worker"""
+    finished = pyqtSignal(object)
+    errored = pyqtSignal(str)
+
+class Worker(QRunnable):
+    """Runs a blocking service call on the Qt thread pool"""
+    
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = WorkerSignals()
+    
+    def run(self):
+        # Signals cross back to the GUI thread as queued connections
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.errored.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+class RowDelegate(QStyledItemDelegate):
+    """Item delegate shared by every table, with a fixed cell size hint"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._size_hint = QSize(COLUMN_WIDTH, ROW_HEIGHT)
+    
+    def sizeHint(self, option, index):
+        # Rows and columns are fixed size, so there is no need to measure text
+        return self._size_hint
+
+class RecordTableModel(QAbstractTableModel):
+    """Read-only table model over a list of record dictionaries"""
+    
+    # (header label, record key) for each column
+    COLUMNS = []
+    
+    # Rows handed to the view per fetchMore() as it scrolls
+    FETCH_BATCH = 200
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._display_rows = []  # Per-row display text, formatted on first paint
+        self._loaded = 0  # Rows exposed to the view so far
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._rows)
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if not parent.isValid():
+            self._expose_rows(self.FETCH_BATCH)
+    
+    def fetch_all(self):
+        """Expose every remaining row to the view at once"""
+        self._expose_rows(len(self._rows))
+    
+    def _expose_rows(self, count):
+        count = min(count, len(self._rows) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def data(self, index, role=DISPLAY_ROLE):
+        # Called per visible cell for every role, so unused roles return first
+        if role == DISPLAY_ROLE:
+            if not index.isValid():
+                return None
+            texts = self._display_rows[index.row()]
+            if texts is None:
+                texts = self._display_row(index.row())
+            return texts[index.column()]
+        if role == USER_ROLE and index.isValid():
+            return self._rows[index.row()]
+        return None
+    
+    def headerData(self, section, orientation, role=DISPLAY_ROLE):
+        if orientation == Qt.Orientation.Horizontal and role == DISPLAY_ROLE:
+            return self.COLUMNS[section][0]
+        return super().headerData(section, orientation, role)
+    
+    def display_value(self, record, key):
+        """Text shown for a record field"""
+        value = record[key]
+        return "" if value is None else str(value)
+    
+    def _display_row(self, row):
+        """Display text of every column in a row, cached until the row changes"""
+        texts = self._display_rows[row]
+        if texts is None:
+            record = self._rows[row]
+            display_value = self.display_value
+            texts = tuple([display_value(record, key) for _, key in self.COLUMNS])
+            self._display_rows[row] = texts
+        return texts
+    
+    def set_rows(self, rows):
+        """Replace all rows with a single model reset"""
+        self.beginResetModel()
+        self._rows = rows
+        self._display_rows = [None] * len(rows)
+        self._loaded = min(len(rows), self.FETCH_BATCH)
+        self.endResetModel()
+    
+    def append_rows(self, rows):
+        """Add records after the existing ones without resetting the model"""
+        fully_loaded = self._loaded == len(self._rows)
+        self._rows.extend(rows)
+        self._display_rows.extend([None] * len(rows))
+        if fully_loaded:
+            self._expose_rows(len(rows))
+    
+    def record_count(self):
+        """Number of records held, including rows not yet fetched by the view"""
+        return len(self._rows)
+    
+    def record(self, row):
+        """Get the full record behind a row"""
+        return self._rows[row]
+    
+    def find_row(self, record_id):
+        """Get the row index of the record with the given ID, or -1"""
+        for row, record in enumerate(self._rows):
+            if record['id'] == record_id:
+                return row
+        return -1
+    
+    def update_row(self, record_id, changes):
+        """Update a record in place and repaint only its row"""
+        row = self.find_row(record_id)
+        if row == -1:
+            return False
+        self._rows[row].update(changes)
+        self._display_rows[row] = None
+        if row < self._loaded:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+        return True
+    
+    def remove_row(self, record_id):
+        """Remove the record with the given ID without resetting the model"""
+        row = self.find_row(record_id)
+        if row == -1:
+            return False
+        if row >= self._loaded:
+            # Not fetched by the view yet, so there is nothing to notify
+            self._remove_at(row)
+            return True
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._remove_at(row)
+        self._loaded -= 1
+        self.endRemoveRows()
+        return True
+    
+    def _remove_at(self, row):
+        del self._rows[row]
+        del self._display_rows[row]
+
+class PatientsModel(RecordTableModel):
+    COLUMNS = [("ID", "id"), ("Name", "name"), ("DOB", "dob"), ("Phone", "phone")]
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._search_keys = []
+    
+    def display_value(self, record, key):
+        if key == "name":
+            return f"{record['first_name']} {record['last_name']}"
+        return super().display_value(record, key)
+    
+    @staticmethod
+    def _search_key(record):
+        """Lowercased searchable text of a patient (every column but the ID)"""
+        # Newlines keep a search term from matching across two fields
+        return f"{record['first_name']} {record['last_name']}\n{record['dob']}\n{record['phone']}".lower()
+    
+    def set_rows(self, rows):
+        search_key = self._search_key
+        self._search_keys = [search_key(record) for record in rows]
+        super().set_rows(rows)
+    
+    def append_rows(self, rows):
+        self._search_keys.extend(self._search_key(record) for record in rows)
+        super().append_rows(rows)
+    
+    def update_row(self, record_id, changes):
+        row = self.find_row(record_id)
+        if row != -1:
+            self._search_keys[row] = self._search_key(dict(self._rows[row], **changes))
+        return super().update_row(record_id, changes)
+    
+    def _remove_at(self, row):
+        super()._remove_at(row)
+        del self._search_keys[row]
+    
+    def search_key(self, row):
+        return self._search_keys[row]
+
+class PatientFilterProxyModel(QSortFilterProxyModel):
+    """Filters patients by substring against each row's precomputed search key"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._search_text = ""
+    
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelReset.connect(self._fetch_all_if_searching)
+    
+    def set_search_text(self, text):
+        self._search_text = text.lower()
+        self._fetch_all_if_searching()
+        self.invalidateFilter()
+    
+    def _fetch_all_if_searching(self):
+        # Matches may sit in rows the view has not scrolled to yet
+        if self._search_text:
+            self.sourceModel().fetch_all()
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._search_text in self.sourceModel().search_key(source_row)
+
+class AppointmentsModel(RecordTableModel):
+    COLUMNS = [("ID", "id"), ("Date", "appointment_date"), ("Purpose", "purpose"), ("Status", "status")]
+
+class TreatmentsModel(RecordTableModel):
+    COLUMNS = [("ID", "id"), ("Condition", "condition"), ("Status", "status")]
+
+class HistoryModel(RecordTableModel):
+    COLUMNS = [("Date", "visit_date"), ("Diagnosis", "diagnosis"), ("Treatment", "treatment")]
+    
+    # Emitted when the view scrolls past the last page fetched from the database
+    more_requested = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._has_more = False
+        self._more_pending = False
+    
+    def set_has_more(self, has_more):
+        """Record whether the database holds further pages; clears any pending request"""
+        self._has_more = has_more
+        self._more_pending = False
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        if super().canFetchMore(parent):
+            return True
+        return not parent.isValid() and self._has_more and not self._more_pending
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if super().canFetchMore(parent):
+            super().fetchMore(parent)
+        elif self.canFetchMore(parent):
+            self._more_pending = True
+            self.more_requested.emit()
+
+class MainWindow(QMainWindow):
+    """Main application window with tab-based navigation"""
+    
+    # Status bar messages
+    _MSG_READY = "Ready - Green Theme Applied"
+    _MSG_CONNECTING = "Connecting to database..."
+    _MSG_STARTUP_FAILED = "Could not connect to the database"
+    _MSG_ERROR = "Error: {error}"
+    _MSG_LOADING_PATIENTS = "Loading patients..."
+    _MSG_PATIENTS_LOADED = "Loaded {n} patients"
+    _MSG_LOADING_APPOINTMENTS = "Loading appointments..."
+    _MSG_APPOINTMENTS_LOADED = "Loaded {n} appointments for selected patient"
+    _MSG_LOADING_TREATMENTS = "Loading treatments..."
+    _MSG_TREATMENTS_LOADED = "Loaded {n} treatments for selected patient"
+    _MSG_TREATMENT_ADDED = "Treatment added successfully"
+    _MSG_TREATMENT_FAILED = "Failed to add treatment"
+    _MSG_LOADING_HISTORY = "Loading medical history..."
+    _MSG_HISTORY_LOADED = "Loaded {n} medical records for selected patient"
+    
+    def __init__(self, patient_service=None):
+        super().__init__()
+        self.patient_service = None
+        
+        # Patient list cache shared by the table and the combo boxes
+        self._patients_cache = None
+        self._patient_by_id = {}
+        
+        # Rendered treatment details, keyed by treatment ID
+        self._treatment_html_cache = {}
+        
+        # One item model backs every patient selection combo box
+        self._patient_combo_model = QStandardItemModel(self)
+        self._patient_combos = []
+        
+        # One delegate draws the cells of every table
+        self._row_delegate = RowDelegate(self)
+        
+        # Status messages set within one event-loop pass are written once
+        self._pending_status = None
+        self._status_scheduled = False
+        
+        self.setWindowTitle("Advanced Patient Management System")
+        self.setMinimumSize(1000, 700)
+        
+        # Apply main stylesheet
+        self.setStyleSheet(APP_STYLE)
+        
+        # Create central widget with tab layout
+        self.central_widget = QTabWidget()
+        self.setCentralWidget(self.central_widget)
+        
+        # Create the patients tab now; the others are built on first visit
+        self.create_patients_tab()
+        self._lazy_tabs = {}
+        for title, builder in (
+            ("Appointments", self.create_appointments_tab),
+            ("Treatments", self.create_treatments_tab),
+            ("Medical History", self.create_medical_history_tab)
+        ):
+            page = QWidget()
+            index = self.central_widget.addTab(page, title)
+            self._lazy_tabs[index] = (page, builder)
+        
+        # Set the first tab as active
+        self.central_widget.setCurrentIndex(0)
+        self.central_widget.currentChanged.connect(self._on_tab_changed)
+        
+        if patient_service is not None:
+            self.set_patient_service(patient_service)
+        else:
+            # Nothing can be loaded or saved until start_services finishes
+            self.central_widget.setEnabled(False)
+            self._set_status(self._MSG_CONNECTING)
+    
+    def start_services(self, factory, *args):
+        """Build the service layer in the background; the window enables itself once it is ready"""
+        self._run_in_background(self.set_patient_service, factory, *args, on_error=self._on_services_failed)
+    
+    def set_patient_service(self, patient_service):
+        """Attach the service layer and load the initial data"""
+        self.patient_service = patient_service
+        self.central_widget.setEnabled(True)
+        
+        # Load patients for the table and the combo boxes
+        self.reload_patients()
+        
+        # Status bar
+        self._set_status(self._MSG_READY)
+    
+    def _on_services_failed(self, message):
+        """Report a service layer that could not be started"""
+        self._set_status(self._MSG_STARTUP_FAILED)
+        QMessageBox.critical(self, "Startup Error", message)
+    
+    def create_patients_tab(self):
+        """Create and configure the patients management tab"""
+        patients_tab = QWidget()
+        main_layout = QHBoxLayout()
+        patients_tab.setLayout(main_layout)
+        
+        # Left side - List of patients
+        left_panel = QWidget()
+        left_layout = QVBoxLayout()
+        left_panel.setLayout(left_layout)
+        
+        # Search and refresh controls
+        search_layout = QHBoxLayout()
+        self.patient_search = QLineEdit()
+        self.patient_search.setPlaceholderText("Search patients...")
+        
+        # Debounce the search so the filter runs once typing pauses
+        self._filter_timer = self._debounce_timer(self.filter_patients, 150)
+        refresh_button = QPushButton("Refresh")
+        search_layout.addWidget(self.patient_search)
+        search_layout.addWidget(refresh_button)
+        left_layout.addLayout(search_layout)
+        
+        # Patients table
+        self.patients_model = PatientsModel(self)
+        self.patients_proxy = PatientFilterProxyModel(self)
+        self.patients_proxy.setSourceModel(self.patients_model)
+        self.patients_table = self._create_table_view(self.patients_proxy)
+        self.patients_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        left_layout.addWidget(self.patients_table)
+        
+        # Add patient button
+        add_patient_button = QPushButton("Add New Patient")
+        add_patient_button.clicked.connect(self.show_add_patient_dialog)
+        left_layout.addWidget(add_patient_button)
+        
+        # Right side - Patient details
+        right_panel = QWidget()
+        right_layout = QVBoxLayout()
+        right_panel.setLayout(right_layout)
+        
+        # Patient details section
+        details_group = QGroupBox("Patient Details")
+        details_layout = QFormLayout()
+        details_group.setLayout(details_layout)
+        
+        self.patient_id_field = QLabel("N/A")
+        self.first_name_field = QLabel("N/A")
+        self.last_name_field = QLabel("N/A")
+        self.dob_field = QLabel("N/A")
+        self.phone_field = QLabel("N/A")
+        self.email_field = QLabel("N/A")
+        
+        details_layout.addRow("Patient ID:", self.patient_id_field)
+        details_layout.addRow("First Name:", self.first_name_field)
+        details_layout.addRow("Last Name:", self.last_name_field)
+        details_layout.addRow("Date of Birth:", self.dob_field)
+        details_layout.addRow("Phone:", self.phone_field)
+        details_layout.addRow("Email:", self.email_field)
+        
+        right_layout.addWidget(details_group)
+        
+        # Action buttons
+        actions_layout = QHBoxLayout()
+        edit_button = QPushButton("Edit Patient")
+        edit_button.clicked.connect(self.show_edit_patient_dialog)
+        delete_button = QPushButton("Delete Patient")
+        delete_button.setObjectName("deleteButton")  # Apply specific style
+        delete_button.clicked.connect(self.delete_patient)
+        actions_layout.addWidget(edit_button)
+        actions_layout.addWidget(delete_button)
+        right_layout.addLayout(actions_layout)
+        
+        # Add a spacer to push everything up
+        right_layout.addStretch()
+        
+        # Add panels to the main layout
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(left_panel)
+        splitter.addWidget(right_panel)
+        splitter.setSizes([400, 600])
+        main_layout.addWidget(splitter)
+        
+        # Connect events
+        self.patients_table.clicked.connect(self.on_patient_selected)
+        refresh_button.clicked.connect(self.reload_patients)
+        self.patient_search.textChanged.connect(self._filter_timer.start)
+        
+        # Add tab to main widget
+        self.central_widget.addTab(patients_tab, "Patients")
+    
+    def create_appointments_tab(self, appointments_tab):
+        """Build the appointments management tab into the given page"""
+        main_layout = QVBoxLayout()
+        appointments_tab.setLayout(main_layout)
+        
+        # Patient selection
+        form_layout = QFormLayout()
+        self.appointment_patient_combo = QComboBox()
+        self.appointment_patient_combo.setModel(self._patient_combo_model)
+        self._patient_combos.append(self.appointment_patient_combo)
+        form_layout.addRow("Select Patient:", self.appointment_patient_combo)
+        main_layout.addLayout(form_layout)
+        
+        # Appointments table
+        self.appointments_model = AppointmentsModel(self)
+        self.appointments_table = self._create_table_view(self.appointments_model)
+        main_layout.addWidget(self.appointments_table)
+        
+        # Add appointment section
+        appointment_group = QGroupBox("Schedule New Appointment")
+        appointment_layout = QFormLayout()
+        appointment_group.setLayout(appointment_layout)
+        
+        self.appointment_datetime = QDateTimeEdit()
+        self.appointment_datetime.setDateTime(QDateTime.currentDateTime())
+        self.appointment_datetime.setCalendarPopup(True)
+        
+        self.appointment_purpose = QLineEdit()
+        
+        appointment_layout.addRow("Date & Time:", self.appointment_datetime)
+        appointment_layout.addRow("Purpose:", self.appointment_purpose)
+        
+        schedule_button = QPushButton("Schedule Appointment")
+        schedule_button.clicked.connect(self.schedule_appointment)
+        appointment_layout.addRow("", schedule_button)
+        
+        main_layout.addWidget(appointment_group)
+        main_layout.addStretch()
+        
+        # Connect events (loads wait until the selection settles)
+        self._appointments_timer = self._debounce_timer(self.load_patient_appointments, 120)
+        self.appointment_patient_combo.currentIndexChanged.connect(lambda _: self._appointments_timer.start())
+    
+    def create_treatments_tab(self, treatments_tab):
+        """Build the treatments management tab into the given page"""
+        main_layout = QVBoxLayout()
+        treatments_tab.setLayout(main_layout)
+        
+        # Patient selection
+        form_layout = QFormLayout()
+        self.treatment_patient_combo = QComboBox()
+        self.treatment_patient_combo.setModel(self._patient_combo_model)
+        self._patient_combos.append(self.treatment_patient_combo)
+        form_layout.addRow("Select Patient:", self.treatment_patient_combo)
+        main_layout.addLayout(form_layout)
+        
+        # Treatments table
+        self.treatments_model = TreatmentsModel(self)
+        self.treatments_table = self._create_table_view(self.treatments_model)
+        main_layout.addWidget(self.treatments_table)
+        
+        # Treatment details when selected
+        self.treatment_details = QTextEdit()
+        self.treatment_details.setReadOnly(True)
+        self.treatment_details.setObjectName(TREATMENT_DETAILS_NAME)
+        main_layout.addWidget(self.treatment_details)
+        
+        # Add treatment section
+        treatment_group = QGroupBox("Add New Treatment")
+        treatment_layout = QFormLayout()
+        treatment_group.setLayout(treatment_layout)
+        
+        self.treatment_condition = QLineEdit()
+        self.treatment_symptoms = QTextEdit()
+        self.treatment_symptoms.setMaximumHeight(100)
+        self.treatment_history = QTextEdit()
+        self.treatment_history.setMaximumHeight(100)
+        
+        treatment_layout.addRow("Condition:", self.treatment_condition)
+        treatment_layout.addRow("Symptoms:", self.treatment_symptoms)
+        treatment_layout.addRow("Patient History:", self.treatment_history)
+        
+        self.add_treatment_button = QPushButton("Add Treatment & Generate AI Analysis")
+        self.add_treatment_button.clicked.connect(self.add_treatment)
+        treatment_layout.addRow("", self.add_treatment_button)
+        
+        main_layout.addWidget(treatment_group)
+        
+        # Connect events (loads wait until the selection settles)
+        self._treatments_timer = self._debounce_timer(self.load_patient_treatments, 120)
+        self.treatment_patient_combo.currentIndexChanged.connect(lambda _: self._treatments_timer.start())
+        self.treatments_table.clicked.connect(self.show_treatment_details)
+    
+    def create_medical_history_tab(self, history_tab):
+        """Build the medical history tab into the given page"""
+        main_layout = QVBoxLayout()
+        history_tab.setLayout(main_layout)
+        
+        # Patient selection
+        form_layout = QFormLayout()
+        self.history_patient_combo = QComboBox()
+        self.history_patient_combo.setModel(self._patient_combo_model)
+        self._patient_combos.append(self.history_patient_combo)
+        form_layout.addRow("Select Patient:", self.history_patient_combo)
+        main_layout.addLayout(form_layout)
+        
+        # Medical history table
+        self.history_model = HistoryModel(self)
+        self.history_model.more_requested.connect(self.load_more_history)
+        self.history_table = self._create_table_view(self.history_model)
+        main_layout.addWidget(self.history_table)
+        
+        # Records are fetched a page at a time, as the table scrolls or on request
+        self.load_more_history_button = QPushButton("Load More")
+        self.load_more_history_button.setEnabled(False)
+        self.load_more_history_button.clicked.connect(self.load_more_history)
+        main_layout.addWidget(self.load_more_history_button)
+        
+        # Add medical history record section
+        history_group = QGroupBox("Add Medical Record")
+        history_layout = QFormLayout()
+        history_group.setLayout(history_layout)
+        
+        self.visit_date = QDateEdit()
+        self.visit_date.setDate(QDate.currentDate())
+        self.visit_date.setCalendarPopup(True)
+        
+        self.history_diagnosis = QLineEdit()
+        self.history_treatment = QLineEdit()
+        self.history_notes = QTextEdit()
+        self.history_notes.setMaximumHeight(100)
+        
+        history_layout.addRow("Visit Date:", self.visit_date)
+        history_layout.addRow("Diagnosis:", self.history_diagnosis)
+        history_layout.addRow("Treatment:", self.history_treatment)
+        history_layout.addRow("Notes:", self.history_notes)
+        
+        add_history_button = QPushButton("Add Medical Record")
+        add_history_button.clicked.connect(self.add_medical_record)
+        history_layout.addRow("", add_history_button)
+        
+        main_layout.addWidget(history_group)
+        
+        # Connect events (loads wait until the selection settles)
+        self._history_patient_id = -1
+        self._history_timer = self._debounce_timer(self.load_patient_medical_history, 120)
+        self.history_patient_combo.currentIndexChanged.connect(self._on_history_patient_changed)
+    
+    def _create_table_view(self, model):
+        """Create a read-only table view over a record model"""
+        view = QTableView()
+        view.setModel(model)
+        view.setItemDelegate(self._row_delegate)
+        view.setAlternatingRowColors(True)
+        horizontal_header = view.horizontalHeader()
+        horizontal_header.setDefaultSectionSize(COLUMN_WIDTH)
+        horizontal_header.setStretchLastSection(True)
+        # Fixed row heights let the view lay out rows without asking each one for a size hint
+        vertical_header = view.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(ROW_HEIGHT)
+        return view
+    
+    def _set_status(self, message):
+        """Show a status bar message, keeping only the last one set in this event-loop pass"""
+        self._pending_status = message
+        if not self._status_scheduled:
+            self._status_scheduled = True
+            QTimer.singleShot(0, self._flush_status)
+    
+    def _flush_status(self):
+        self._status_scheduled = False
+        self.statusBar().showMessage(self._pending_status)
+    
+    def _debounce_timer(self, slot, interval):
+        """Create a single-shot timer that calls slot once restarts stop for interval ms"""
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(interval)
+        timer.timeout.connect(slot)
+        return timer
+    
+    def _on_tab_changed(self, index):
+        """Build a tab's widgets the first time it is opened"""
+        pending = self._lazy_tabs.pop(index, None)
+        if pending:
+            page, builder = pending
+            builder(page)
+    
+    def _get_patients(self):
+        """Return the cached patient list, loading it from the service on a miss"""
+        if self._patients_cache is None:
+            self._set_patients_cache(self.patient_service.list_patients())
+        return self._patients_cache
+    
+    def _set_patients_cache(self, patients):
+        """Store the patient list and index it by patient ID"""
+        self._patients_cache = patients
+        self._patient_by_id = {patient['id']: patient for patient in patients}
+    
+    def _run_in_background(self, callback, fn, *args, on_error=None):
+        """Run a blocking service call on the thread pool and pass its result to callback"""
+        worker = Worker(fn, *args)
+        worker.signals.finished.connect(callback)
+        worker.signals.errored.connect(on_error or self._on_background_error)
+        QThreadPool.globalInstance().start(worker)
+    
+    def _watch_future(self, future, callback, on_error=None, transform=None):
+        """Pass a concurrent.futures.Future's result, optionally transformed, to callback on the GUI thread"""
+        signals = WorkerSignals(self)
+        signals.finished.connect(callback)
+        signals.errored.connect(on_error or self._on_background_error)
+        
+        def done(future):
+            # Runs on the executor thread; the signals queue the result to the GUI thread
+            try:
+                result = future.result()
+                if transform:
+                    result = transform(result)
+            except Exception as e:
+                signals.errored.emit(str(e))
+            else:
+                signals.finished.emit(result)
+            signals.deleteLater()
+        
+        future.add_done_callback(done)
+    
+    def _on_background_error(self, message):
+        """Report a background service call that raised"""
+        self._set_status(self._MSG_ERROR.format(error=message))
+    
+    def reload_patients(self):
+        """Drop the patient cache and reload every patient view in the background"""
+        self._patients_cache = None
+        self._set_status(self._MSG_LOADING_PATIENTS)
+        self._run_in_background(self._on_patients_loaded, self.patient_service.list_patients)
+    
+    def _on_patients_loaded(self, patients):
+        """Show patients loaded in the background"""
+        self._set_patients_cache(patients)
+        self.refresh_patients()
+        self._rebuild_patient_combo_model()
+    
+    def refresh_patients(self):
+        """Refresh the patients table with data from service"""
+        patients = self._get_patients()
+        self.patients_model.set_rows(patients)
+        
+        self._set_status(self._MSG_PATIENTS_LOADED.format(n=len(patients)))
+    
+    def filter_patients(self):
+        """Filter patients table based on search input"""
+        self.patients_proxy.set_search_text(self.patient_search.text())
+    
+    def on_patient_selected(self, index):
+        """Handle patient selection in the table"""
+        if not index.isValid():
+            return
+            
+        # The row already holds the full patient record
+        index = self.patients_proxy.mapToSource(index)
+        self._show_patient_details(self.patients_model.record(index.row()))
+    
+    def _show_patient_details(self, patient):
+        """Fill the patient details panel"""
+        self.patient_id_field.setText(str(patient['id']))
+        self.first_name_field.setText(patient['first_name'])
+        self.last_name_field.setText(patient['last_name'])
+        self.dob_field.setText(str(patient['dob']))
+        self.phone_field.setText(patient['phone'])
+        self.email_field.setText(patient['email'] or "N/A")
+    
+    def show_add_patient_dialog(self):
+        """Show dialog to add a new patient"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Add New Patient")
+        dialog.setMinimumWidth(400)
+        dialog.setObjectName(PATIENT_FORM_NAME)
+        
+        layout = QFormLayout()
+        dialog.setLayout(layout)
+        
+        # Form fields
+        first_name = QLineEdit()
+        last_name = QLineEdit()
+        dob = QDateEdit()
+        dob.setCalendarPopup(True)
+        dob.setDate(QDate(2000, 1, 1))  # Default date
+        phone = QLineEdit()
+        email = QLineEdit()
+        
+        layout.addRow("First Name*:", first_name)
+        layout.addRow("Last Name*:", last_name)
+        layout.addRow("Date of Birth*:", dob)
+        layout.addRow("Phone*:", phone)
+        layout.addRow("Email:", email)
+        
+        # Buttons
+        button_box = QHBoxLayout()
+        save_button = QPushButton("Save")
+        save_button.setFixedWidth(120)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.setFixedWidth(120)
+        
+        button_box.addWidget(save_button)
+        button_box.addWidget(cancel_button)
+        layout.addRow("", button_box)
+        
+        # Connect events
+        save_button.clicked.connect(lambda: self.save_new_patient(
+            dialog, first_name.text(), last_name.text(), 
+            dob.date().toString("yyyy-MM-dd"), phone.text(), email.text()
+        ))
+        cancel_button.clicked.connect(dialog.reject)
+        
+        # Show dialog
+        dialog.exec()
+    
+    def save_new_patient(self, dialog, first_name, last_name, dob, phone, email):
+        """Save a new patient to the database"""
+        # Validate required fields
+        if not first_name or not last_name or not dob or not phone:
+            QMessageBox.warning(self, "Validation Error", "Please fill in all required fields.")
+            return
+        
+        patient_data = {
+            'first_name': first_name,
+            'last_name': last_name,
+            'dob': dob,
+            'phone': phone,
+            'email': email if email else None
+        }
+        
+        if self.patient_service.add_patient(patient_data):
+            QMessageBox.information(self, "Success", "Patient added successfully!")
+            dialog.accept()
+            
+            # Refresh patient lists
+            self.reload_patients()
+        else:
+            QMessageBox.critical(self, "Error", "Failed to add patient.")
+    
+    def show_edit_patient_dialog(self):
+        """Show dialog to edit selected patient"""
+        if not self.patient_id_field.text() or self.patient_id_field.text() == "N/A":
+            QMessageBox.warning(self, "No Selection", "Please select a patient to edit.")
+            return
+            
+        patient_id = int(self.patient_id_field.text())
+        patient = self._patient_by_id.get(patient_id) or self.patient_service.get_patient(patient_id)
+        
+        if not patient:
+            QMessageBox.critical(self, "Error", "Failed to load patient details.")
+            return
+            
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Edit Patient: {patient['first_name']} {patient['last_name']}")
+        dialog.setMinimumWidth(400)
+        dialog.setObjectName(PATIENT_FORM_NAME)
+        
+        layout = QFormLayout()
+        dialog.setLayout(layout)
+        
+        # Form fields with current values
+        first_name = QLineEdit(patient['first_name'])
+        last_name = QLineEdit(patient['last_name'])
+        
+        dob = QDateEdit()
+        dob.setCalendarPopup(True)
+        dob_raw = patient['dob']
+        if isinstance(dob_raw, str):
+            date = QDate.fromString(dob_raw, "yyyy-MM-dd")
+        elif dob_raw is not None:  # datetime.date from the database
+            date = QDate(dob_raw.year, dob_raw.month, dob_raw.day)
+        else:
+            date = QDate.currentDate()
+        dob.setDate(date if date.isValid() else QDate.currentDate())
+        
+        phone = QLineEdit(patient['phone'])
+        email = QLineEdit(patient['email'] if patient['email'] else "")
+        
+        layout.addRow("First Name*:", first_name)
+        layout.addRow("Last Name*:", last_name)
+        layout.addRow("Date of Birth*:", dob)
+        layout.addRow("Phone*:", phone)
+        layout.addRow("Email:", email)
+        
+        # Buttons
+        button_box = QHBoxLayout()
+        save_button = QPushButton("Save Changes")
+        save_button.setFixedWidth(140)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.setFixedWidth(120)
+        
+        button_box.addWidget(save_button)
+        button_box.addWidget(cancel_button)
+        layout.addRow("", button_box)
+        
+        # Connect events
+        save_button.clicked.connect(lambda: self.save_edited_patient(
+            dialog, patient_id, first_name.text(), last_name.text(), 
+            dob.date().toString("yyyy-MM-dd"), phone.text(), email.text()
+        ))
+        cancel_button.clicked.connect(dialog.reject)
+        
+        # Show dialog
+        dialog.exec()
+    
+    def save_edited_patient(self, dialog, patient_id, first_name, last_name, dob, phone, email):
+        """Save edited patient information"""
+        # Validate required fields
+        if not first_name or not last_name or not dob or not phone:
+            QMessageBox.warning(self, "Validation Error", "Please fill in all required fields.")
+            return
+        
+        update_data = {
+            'first_name': first_name,
+            'last_name': last_name,
+            'dob': dob,
+            'phone': phone,
+            'email': email if email else None
+        }
+        
+        if self.patient_service.update_patient(patient_id, update_data):
+            QMessageBox.information(self, "Success", "Patient updated successfully!")
+            dialog.accept()
+            
+            # Update the cached record, table row and combo item in place
+            self.patients_model.update_row(patient_id, update_data)
+            self._update_patient_combo_item(patient_id, first_name, last_name)
+            self._show_patient_details(dict(update_data, id=patient_id))
+        else:
+            QMessageBox.critical(self, "Error", "Failed to update patient.")
+    
+    def delete_patient(self):
+        """Delete the selected patient"""
+        if not self.patient_id_field.text() or self.patient_id_field.text() == "N/A":
+            QMessageBox.warning(self, "No Selection", "Please select a patient to delete.")
+            return
+            
+        patient_id = int(self.patient_id_field.text())
+        
+        # Confirm deletion
+        reply = QMessageBox.question(
+            self, "Confirm Deletion", 
+            f"Are you sure you want to delete patient {self.first_name_field.text()} {self.last_name_field.text()}?\n\nThis will also delete all associated records.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            if self.patient_service.delete_patient(patient_id):
+                QMessageBox.information(self, "Success", "Patient deleted successfully!")
+                
+                # Reset patient details
+                self.patient_id_field.setText("N/A")
+                self.first_name_field.setText("N/A")
+                self.last_name_field.setText("N/A")
+                self.dob_field.setText("N/A")
+                self.phone_field.setText("N/A")
+                self.email_field.setText("N/A")
+                
+                # Drop the patient from the cache, table and combo boxes in place
+                self._patient_by_id.pop(patient_id, None)
+                self.patients_model.remove_row(patient_id)
+                self._remove_patient_combo_item(patient_id)
+            else:
+                QMessageBox.critical(self, "Error", "Failed to delete patient.")
+    
+    def _rebuild_patient_combo_model(self):
+        """Load patients into the model shared by the patient combo boxes"""
+        patients = self._get_patients()
+        items = [self._patient_combo_item("-- Select Patient --", -1)]
+        items += [
+            self._patient_combo_item(f"{p['id']}: {p['first_name']} {p['last_name']}", p['id'])
+            for p in patients
+        ]
+        
+        # Rebuild without firing selection signals, then restore each selection
+        combos = self._patient_combos
+        selected_ids = [self.get_selected_patient_id(combo) for combo in combos]
+        blockers = [QSignalBlocker(combo) for combo in combos]
+        
+        # Insert every row in one batch so views are notified once
+        self._patient_combo_model.clear()
+        self._patient_combo_model.invisibleRootItem().appendRows(items)
+        
+        for combo, patient_id in zip(combos, selected_ids):
+            combo.setCurrentIndex(max(combo.findData(patient_id), 0))
+        for blocker in blockers:
+            blocker.unblock()
+        
+        # Only combos whose patient disappeared need to reload
+        for combo, patient_id in zip(combos, selected_ids):
+            if self.get_selected_patient_id(combo) != patient_id:
+                combo.currentIndexChanged.emit(combo.currentIndex())
+    
+    @staticmethod
+    def _patient_combo_item(text, patient_id):
+        """Create a combo item carrying the patient ID in its user data"""
+        item = QStandardItem(text)
+        item.setData(patient_id, USER_ROLE)
+        return item
+    
+    def _find_patient_combo_item(self, patient_id):
+        """Get the shared combo model index for a patient ID, or None"""
+        model = self._patient_combo_model
+        matches = model.match(
+            model.index(0, 0), USER_ROLE, patient_id, 1,
+            Qt.MatchFlag.MatchExactly
+        )
+        return matches[0] if matches else None
+    
+    def _update_patient_combo_item(self, patient_id, first_name, last_name):
+        """Rename a patient in the shared combo model"""
+        index = self._find_patient_combo_item(patient_id)
+        if index is not None:
+            self._patient_combo_model.itemFromIndex(index).setText(f"{patient_id}: {first_name} {last_name}")
+    
+    def _remove_patient_combo_item(self, patient_id):
+        """Remove a patient from the shared combo model"""
+        index = self._find_patient_combo_item(patient_id)
+        if index is not None:
+            self._patient_combo_model.removeRow(index.row())
+    
+    def get_selected_patient_id(self, combo_box):
+        """Get the selected patient ID from a combo box"""
+        patient_id = combo_box.currentData()
+        # Ensure we have a valid patient ID
+        if patient_id is None or patient_id == -1:
+            return -1
+        return patient_id
+    
+    def _on_history_patient_changed(self, index):
+        """Remember the history tab's patient and schedule a reload"""
+        self._history_patient_id = self.get_selected_patient_id(self.history_patient_combo)
+        self._history_timer.start()
+    
+    def load_patient_appointments(self):
+        """Load appointments for the selected patient"""
+        patient_id = self.get_selected_patient_id(self.appointment_patient_combo)
+        if patient_id == -1:
+            self.appointments_model.set_rows([])
+            return
+            
+        # Show a status message while loading
+        self._set_status(self._MSG_LOADING_APPOINTMENTS)
+        
+        self._run_in_background(
+            lambda appointments: self._on_appointments_loaded(patient_id, appointments),
+            self.patient_service.get_patient_appointments, patient_id
+        )
+    
+    def _on_appointments_loaded(self, patient_id, appointments):
+        """Show appointments loaded in the background"""
+        if patient_id != self.get_selected_patient_id(self.appointment_patient_combo):
+            return  # Selection changed while loading
+        
+        self.appointments_model.set_rows(appointments)
+        
+        self._set_status(self._MSG_APPOINTMENTS_LOADED.format(n=len(appointments)))
+    
+    def schedule_appointment(self):
+        """Schedule a new appointment for the selected patient"""
+        patient_id = self.get_selected_patient_id(self.appointment_patient_combo)
+        if patient_id == -1:
+            QMessageBox.warning(self, "No Selection", "Please select a patient.")
+            return
+            
+        appointment_data = {
+            'appointment_date': self.appointment_datetime.dateTime().toString("yyyy-MM-dd HH:mm:ss"),
+            'purpose': self.appointment_purpose.text()
+        }
+        
+        if not appointment_data['purpose']:
+            QMessageBox.warning(self, "Validation Error", "Please enter a purpose for the appointment.")
+            return
+            
+        if self.patient_service.schedule_appointment(patient_id, appointment_data):
+            QMessageBox.information(self, "Success", "Appointment scheduled successfully!")
+            
+            # Clear form
+            self.appointment_purpose.clear()
+            
+            # Reload appointments
+            self.load_patient_appointments()
+        else:
+            QMessageBox.critical(self, "Error", "Failed to schedule appointment.")
+    
+    def load_patient_treatments(self):
+        """Load treatments for the selected patient"""
+        # Stored AI results may have changed (e.g. a bulk re-analysis), so render details afresh
+        self._treatment_html_cache.clear()
+        patient_id = self.get_selected_patient_id(self.treatment_patient_combo)
+        if patient_id == -1:
+            self.treatments_model.set_rows([])
+            self.treatment_details.clear()
+            return
+            
+        # Show a status message while loading
+        self._set_status(self._MSG_LOADING_TREATMENTS)
+        
+        self._run_in_background(
+            lambda treatments: self._on_treatments_loaded(patient_id, treatments),
+            self.patient_service.get_patient_treatments, patient_id
+        )
+    
+    def _on_treatments_loaded(self, patient_id, treatments):
+        """Show treatments loaded in the background"""
+        if patient_id != self.get_selected_patient_id(self.treatment_patient_combo):
+            return  # Selection changed while loading
+        
+        self.treatments_model.set_rows(treatments)
+        
+        self._set_status(self._MSG_TREATMENTS_LOADED.format(n=len(treatments)))
+    
+    def show_treatment_details(self, index):
+        """Show details of the selected treatment"""
+        treatment_data = self.treatments_model.record(index.row())
+        
+        if not treatment_data:
+            return
+        
+        details = self._treatment_html_cache.get(treatment_data['id'])
+        if details is None:
+            details = self._build_treatment_html(treatment_data)
+            self._treatment_html_cache[treatment_data['id']] = details
+        
+        self.treatment_details.setHtml(details)
+    
+    def _build_treatment_html(self, treatment_data):
+        """Render the details view of a stored treatment"""
+        return TREATMENT_DETAILS_TEMPLATE.format(
+            condition=html_text(treatment_data['condition']),
+            symptoms=html_text(treatment_data['symptoms']),
+            status=html_text(treatment_data['status']),
+            created_at=html_text(treatment_data['created_at']),
+            analysis=html_text((treatment_data['ai_analysis'] or {}).get('analysis', 'No analysis available')),
+            plan=html_text((treatment_data['treatment_plan'] or {}).get('treatment_plan', 'No treatment plan available'))
+        )
+    
+    def add_treatment(self):
+        """Add a new treatment for the selected patient"""
+        patient_id = self.get_selected_patient_id(self.treatment_patient_combo)
+        if patient_id == -1:
+            QMessageBox.warning(self, "No Selection", "Please select a patient.")
+            return
+            
+        condition = self.treatment_condition.text()
+        symptoms = self.treatment_symptoms.toPlainText()
+        
+        if not condition or not symptoms:
+            QMessageBox.warning(self, "Validation Error", "Please enter both condition and symptoms.")
+            return
+            
+        treatment_data = {
+            'condition': condition,
+            'symptoms': symptoms,
+            'patient_history': self.treatment_history.toPlainText()
+        }
+        
+        # Busy indicator (a 0..0 range) that Qt animates while the worker runs
+        wait_dialog = QProgressDialog(
+            "Generating AI analysis and treatment plan...\nThis may take up to 30 seconds.",
+            None, 0, 0, self
+        )
+        wait_dialog.setWindowTitle("Processing AI Analysis")
+        wait_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        wait_dialog.setMinimumDuration(0)
+        wait_dialog.show()
+        
+        # One AI request at a time; the result slots re-enable the button
+        self.add_treatment_button.setEnabled(False)
+        
+        # The service runs the AI calls on its own executor so the event loop keeps the dialog painted
+        self._watch_future(
+            self.patient_service.add_treatment_async(patient_id, treatment_data),
+            lambda result: self._on_treatment_added(wait_dialog, *result),
+            on_error=lambda message: self._on_treatment_failed(wait_dialog, message),
+            # Render the results HTML on the worker thread as well
+            transform=lambda result: result + (render_ai_results(result[1], result[2]),)
+        )
+    
+    def _on_treatment_failed(self, wait_dialog, message):
+        """Report a treatment whose background AI or database call raised"""
+        wait_dialog.close()
+        self.add_treatment_button.setEnabled(True)
+        self._set_status(self._MSG_TREATMENT_FAILED)
+        QMessageBox.critical(self, "Error", f"Failed to add treatment: {message}")
+    
+    def _on_treatment_added(self, wait_dialog, success, ai_analysis, treatment_plan, results_html):
+        """Show the result of a treatment added in the background"""
+        wait_dialog.close()
+        self.add_treatment_button.setEnabled(True)
+        
+        if success:
+            QMessageBox.information(self, "Success", "Treatment added successfully with AI analysis!")
+            
+            # Clear form
+            self.treatment_condition.clear()
+            self.treatment_symptoms.clear()
+            self.treatment_history.clear()
+            
+            # Show AI analysis results
+            self.treatment_details.setHtml(results_html)
+            
+            # Reload treatments
+            self.load_patient_treatments()
+            self._set_status(self._MSG_TREATMENT_ADDED)
+        else:
+            error_msg = "Failed to add treatment."
+            if ai_analysis.get('error'):
+                error_msg += f"\nAnalysis error: {ai_analysis.get('error')}"
+            if treatment_plan.get('error'):
+                error_msg += f"\nTreatment plan error: {treatment_plan.get('error')}"
+                
+            QMessageBox.critical(self, "Error", error_msg)
+            self._set_status(self._MSG_TREATMENT_FAILED)
+    
+    def load_patient_medical_history(self):
+        """Load medical history for the selected patient"""
+        self.load_more_history_button.setEnabled(False)
+        self.history_model.set_has_more(False)
+        patient_id = self._history_patient_id
+        if patient_id == -1:
+            self.history_model.set_rows([])
+            return
+            
+        # Show a status message while loading
+        self._set_status(self._MSG_LOADING_HISTORY)
+        
+        self._run_in_background(
+            lambda history: self._on_medical_history_loaded(patient_id, 0, history),
+            self.patient_service.get_patient_medical_history, patient_id, HISTORY_PAGE_SIZE, 0
+        )
+    
+    def load_more_history(self):
+        """Append the next page of medical history for the selected patient"""
+        patient_id = self._history_patient_id
+        if patient_id == -1:
+            return
+        
+        self.load_more_history_button.setEnabled(False)
+        self.history_model.set_has_more(False)
+        offset = self.history_model.record_count()
+        self._run_in_background(
+            lambda history: self._on_medical_history_loaded(patient_id, offset, history),
+            self.patient_service.get_patient_medical_history, patient_id, HISTORY_PAGE_SIZE, offset,
+            on_error=lambda message: self._on_more_history_failed(patient_id, offset, message)
+        )
+    
+    def _on_more_history_failed(self, patient_id, offset, message):
+        """Report a history page that failed to load and let the user retry it"""
+        # Only re-arm paging if the same history is still showing unchanged
+        if patient_id == self._history_patient_id and offset == self.history_model.record_count():
+            self.history_model.set_has_more(True)
+            self.load_more_history_button.setEnabled(True)
+        self._on_background_error(message)
+    
+    def _on_medical_history_loaded(self, patient_id, offset, history):
+        """Show a page of medical history loaded in the background"""
+        if patient_id != self._history_patient_id:
+            return  # Selection changed while loading
+        
+        if offset == 0:
+            self.history_model.set_rows(history)
+        elif offset == self.history_model.record_count():
+            self.history_model.append_rows(history)
+        else:
+            return  # The history was reloaded while this page was loading
+        
+        # A short page means there is nothing left to fetch
+        has_more = len(history) == HISTORY_PAGE_SIZE
+        self.history_model.set_has_more(has_more)
+        self.load_more_history_button.setEnabled(has_more)
+        
+        self._set_status(self._MSG_HISTORY_LOADED.format(n=self.history_model.record_count()))
+    
+    def add_medical_record(self):
+        """Add a new medical history record for the selected patient"""
+        patient_id = self._history_patient_id
+        if patient_id == -1:
+            QMessageBox.warning(self, "No Selection", "Please select a patient.")
+            return
+            
+        diagnosis = self.history_diagnosis.text()
+        treatment = self.history_treatment.text()
+        if not diagnosis or not treatment:
+            QMessageBox.warning(self, "Validation Error", "Please enter both diagnosis and treatment.")
+            return
+        
+        history_data = {
+            'visit_date': self.visit_date.date().toString("yyyy-MM-dd"),
+            'diagnosis': diagnosis,
+            'treatment': treatment,
+            'notes': self.history_notes.toPlainText()
+        }
+        
+        if self.patient_service.add_medical_history(patient_id, history_data):
+            QMessageBox.information(self, "Success", "Medical record added successfully!")
+            
+            # Clear form
+            self.history_diagnosis.clear()
+            self.history_treatment.clear()
+            self.history_notes.clear()
+            
+            # Reload history
+            self.load_patient_medical_history()
+        else:
+            QMessageBox.critical(self, "Error", "Failed to add medical record.")
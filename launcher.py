@@ -1,7 +1,7 @@
 
+import importlib
 import sys
-import os
- 
+
 def show_welcome():
     """Display welcome message and options"""
     print("\n" + "="*60)
@@ -14,32 +14,42 @@ def show_welcome():
     print("3. Exit")
     return input("\nEnter your choice (1-3): ")
 
+def run_interface(module_name):
+    """Import an interface module and run its main(); returns False if an import failed"""
+    try:
+        importlib.import_module(module_name).main()
+        return True
+    except ImportError as e:
+        # Drop the partly initialised module so a retry imports it afresh
+        sys.modules.pop(module_name, None)
+        print(f"\nError: {str(e)}")
+        return False
+
 def main():
     """Main launcher function"""
+    # Scripted or headless launches pick the interface without prompting
+    args = sys.argv[1:]
+    if '--tui' in args:
+        return importlib.import_module('main').main()
+    if '--gui' in args or not sys.stdin.isatty():
+        return importlib.import_module('app_gui').main()
+    
     while True:
         choice = show_welcome()
         
         if choice == '1':
             print("\nLaunching GUI interface with Green Theme...")
-            try:
-                import app_gui
-                app_gui.main()
+            if run_interface('app_gui'):
                 break
-            except ImportError as e:
-                print(f"\nError: {str(e)}")
-                print("Make sure PyQt6 is installed. Run: pip install PyQt6")
-                input("\nPress Enter to continue...")
+            print("Make sure PyQt6 is installed. Run: pip install PyQt6")
+            input("\nPress Enter to continue...")
         
         elif choice == '2':
             print("\nLaunching terminal interface...")
-            try:
-                import main
-                main.main()
+            if run_interface('main'):
                 break
-            except ImportError as e:
-                print(f"\nError: {str(e)}")
-                print("Make sure all dependencies are installed. Run: pip install -r requirements.txt")
-                input("\nPress Enter to continue...")
+            print("Make sure all dependencies are installed. Run: pip install -r requirements.txt")
+            input("\nPress Enter to continue...")
         
         elif choice == '3':
             print("\nExiting application. Goodbye!")
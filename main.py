@@ -1,11 +1,25 @@
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
 import logging
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Mapping
 import os
 from datetime import datetime, timedelta
 import json
+import orjson
+import csv
+import io
+import struct
+import re
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
 from psycopg2 import pool
-import google.generativeai as genai
 from dotenv import load_dotenv  
 import uuid
 import sys
@@ -25,6 +39,14 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Numbered points ("1. ...") in AI responses, indented when the CLI prints them
+_NUMBERED_POINT_RE = re.compile(r'^\d+\.')
+
+# Banners framing the CLI's AI reports, built once
+_BANNER = "=" * 60
+_HEADER_ANALYSIS = f"\n{_BANNER}\n{' ' * 20}AI SYMPTOM ANALYSIS\n{_BANNER}"
+_HEADER_PLAN = f"\n{_BANNER}\n{' ' * 20}AI TREATMENT PLAN\n{_BANNER}"
+
 # Database schema definitions - separated from code
 SCHEMAS = {
     "extensions": [
@@ -77,15 +99,28 @@ SCHEMAS = {
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             );
         """
+    },
+    # Composite indexes matching the per-patient reads' filter and sort order
+    "indexes": {
+        "idx_appointments_patient_date":
+            "CREATE INDEX IF NOT EXISTS idx_appointments_patient_date ON appointments (patient_id, appointment_date);",
+        "idx_treatments_patient_created":
+            "CREATE INDEX IF NOT EXISTS idx_treatments_patient_created ON treatments (patient_id, created_at DESC);",
+        "idx_medical_history_patient_visit":
+            "CREATE INDEX IF NOT EXISTS idx_medical_history_patient_visit ON medical_history (patient_id, visit_date DESC, id);"
     }
 }
 
+# Set once setup_database has created or found the schema, so later calls in this process skip it
+_SCHEMA_READY = False
+
 class ConfigManager:
     """Manages application configuration with fallbacks and validation"""
     
     @staticmethod
-    def get_db_config() -> Dict[str, str]:
-        """Get database configuration from environment variables or config file"""
+    @lru_cache(maxsize=1)
+    def get_db_config() -> Mapping[str, str]:
+        """Get database configuration from environment variables or config file (read-only, cached)"""
         # Priority: ENV vars > config file > defaults somthing like this
         config = {
             "dbname": os.getenv("DB_NAME", "postgres"),
@@ -108,96 +143,316 @@ class ConfigManager:
             except Exception as e:
                 logger.warning(f"Failed to load config file: {str(e)}")
         
-        return config
+        # Read-only, since every caller shares the one cached copy
+        return MappingProxyType(config)
     
     @staticmethod
-    def get_ai_config() -> Dict[str, str]:
-        """Get AI configuration from environment variables"""
+    @lru_cache(maxsize=1)
+    def get_ai_config() -> Mapping[str, str]:
+        """Get AI configuration from environment variables (read-only, cached)"""
         api_key = os.getenv("GEMINI_API_KEY") #I have deleted my gemini api key purposefully not to show it here
         model_name = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
         
         if not api_key:
             logger.warning("GEMINI_API_KEY not found in environment variables")
         
-        return {
+        return MappingProxyType({
             "api_key": api_key,
             "model_name": model_name
-        }
+        })
     
     @staticmethod
-    def validate_config(config: Dict[str, Any], required_keys: List[str]) -> Tuple[bool, str]:
+    def reload() -> None:
+        """Forget cached configuration so the next get_* call re-reads env vars and config.json"""
+        ConfigManager.get_db_config.cache_clear()
+        ConfigManager.get_ai_config.cache_clear()
+    
+    @staticmethod
+    def validate_config(config: Mapping[str, Any], required_keys: List[str]) -> Tuple[bool, str]:
         """Validate that all required keys exist in config"""
         missing = [key for key in required_keys if not config.get(key)]
         if missing:
             return False, f"Missing required configuration: {', '.join(missing)}"
         return True, ""
 
+# Hot read statements, prepared server-side once per pooled connection ($n placeholders)
+PREPARED_STATEMENTS = {
+    "patient_by_id": """
+        SELECT id, first_name, last_name, dob, phone, email
+        FROM patients
+        WHERE id = $1
+        LIMIT 1
+    """,
+    "patient_exists": """
+        SELECT EXISTS (SELECT 1 FROM patients WHERE id = $1) AS found
+    """,
+    "appointments_by_patient": """
+        SELECT id, appointment_date, purpose, status
+        FROM appointments
+        WHERE patient_id = $1
+        ORDER BY appointment_date
+    """,
+    "treatments_by_patient": """
+        SELECT id, condition, symptoms, ai_analysis, treatment_plan, status, created_at
+        FROM treatments
+        WHERE patient_id = $1
+        ORDER BY created_at DESC
+    """,
+    "medical_history_by_patient": """
+        SELECT id, visit_date, diagnosis, treatment, notes
+        FROM medical_history
+        WHERE patient_id = $1
+        ORDER BY visit_date DESC, id
+        LIMIT $2 OFFSET $3
+    """,
+    # Patient, upcoming appointments, recent treatments and history in one round-trip; $2 caps each list
+    "patient_dashboard": """
+        SELECT p.id, p.first_name, p.last_name, p.dob, p.phone, p.email,
+            COALESCE((
+                SELECT jsonb_agg(jsonb_build_object(
+                    'id', a.id, 'appointment_date', to_char(a.appointment_date, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+                    'purpose', a.purpose, 'status', a.status
+                ) ORDER BY a.appointment_date)
+                FROM (
+                    SELECT id, appointment_date, purpose, status
+                    FROM appointments
+                    WHERE patient_id = p.id AND appointment_date >= CURRENT_TIMESTAMP
+                    ORDER BY appointment_date
+                    LIMIT $2
+                ) a
+            ), '[]'::jsonb) AS appointments,
+            COALESCE((
+                SELECT jsonb_agg(jsonb_build_object(
+                    'id', t.id, 'condition', t.condition, 'symptoms', t.symptoms,
+                    'ai_analysis', t.ai_analysis, 'treatment_plan', t.treatment_plan, 'status', t.status,
+                    'created_at', to_char(t.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US')
+                ) ORDER BY t.created_at DESC)
+                FROM (
+                    SELECT id, condition, symptoms, ai_analysis, treatment_plan, status, created_at
+                    FROM treatments
+                    WHERE patient_id = p.id
+                    ORDER BY created_at DESC
+                    LIMIT $2
+                ) t
+            ), '[]'::jsonb) AS treatments,
+            COALESCE((
+                SELECT jsonb_agg(jsonb_build_object(
+                    'id', h.id, 'visit_date', to_char(h.visit_date, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+                    'diagnosis', h.diagnosis, 'treatment', h.treatment, 'notes', h.notes
+                ) ORDER BY h.visit_date DESC, h.id)
+                FROM (
+                    SELECT id, visit_date, diagnosis, treatment, notes
+                    FROM medical_history
+                    WHERE patient_id = p.id
+                    ORDER BY visit_date DESC, id
+                    LIMIT $2
+                ) h
+            ), '[]'::jsonb) AS medical_history
+        FROM patients p
+        WHERE p.id = $1
+    """
+}
+
+# PostgreSQL binary COPY framing: signature, flags and header extension length, then a -1 field count
+PG_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PG_COPY_TRAILER = struct.pack("!h", -1)
+PG_COPY_NULL = struct.pack("!i", -1)
+PG_EPOCH = datetime(2000, 1, 1)
+
+def copy_int4(value: int) -> bytes:
+    return struct.pack("!i", value)
+
+def copy_text(value: str) -> bytes:
+    return str(value).encode("utf-8")
+
+def copy_jsonb(value: Any) -> bytes:
+    # jsonb's binary format is a version byte followed by the JSON text
+    return b"\x01" + orjson.dumps(value)
+
+def copy_timestamp(value: Any) -> bytes:
+    # Microseconds since the PostgreSQL epoch; accepts datetimes, dates and ISO strings
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    delta = value - PG_EPOCH
+    return struct.pack("!q", (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+def binary_copy_buffer(rows: List[tuple], encoders: List[Any]) -> io.BytesIO:
+    """Encode rows for COPY ... FROM STDIN WITH (FORMAT binary); None values become NULL"""
+    buffer = io.BytesIO()
+    write = buffer.write
+    write(PG_COPY_HEADER)
+    field_count = struct.pack("!h", len(encoders))
+    for row in rows:
+        write(field_count)
+        for value, encode in zip(row, encoders):
+            if value is None:
+                write(PG_COPY_NULL)
+            else:
+                data = encode(value)
+                write(struct.pack("!i", len(data)))
+                write(data)
+    write(PG_COPY_TRAILER)
+    buffer.seek(0)
+    return buffer
+
+# Decode json/jsonb columns with orjson instead of the stdlib json module
+psycopg2.extras.register_default_json(globally=True, loads=orjson.loads)
+psycopg2.extras.register_default_jsonb(globally=True, loads=orjson.loads)
+
+# Dict parameters are sent as JSON, serialized by orjson
+psycopg2.extensions.register_adapter(
+    dict, lambda value: psycopg2.extras.Json(value, dumps=lambda obj: orjson.dumps(obj).decode())
+)
+
+# Errors that mean the connection itself is unusable (dropped by the server, closed, reset)
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+# Shared worker pool for Gemini calls, so each request doesn't spin up its own threads
+AI_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="gemini")
+
+class PooledConnection(psycopg2.extensions.connection):
+    """Connection that remembers which statements are prepared on its session"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
 class DatabaseConnection:
-    """Single database connection handler with reconnection logic"""
+    """Pooled database connection handler with reconnection logic"""
     
-    def __init__(self, config: Dict[str, str]):
+    def __init__(self, config: Mapping[str, str], min_connections: int = 2, max_connections: int = 8):
         self.config = config
-        self.conn = None
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.pool = None
         self._connect()
     
     def _connect(self) -> bool:
-        """Establish database connection with retry logic"""
+        """Create the connection pool if it isn't open yet"""
         try:
-            if self.conn and not self.conn.closed:
+            if self.pool and not self.pool.closed:
                 return True
                 
-            self.conn = psycopg2.connect(**self.config)
-            self.conn.autocommit = False
+            self.pool = pool.ThreadedConnectionPool(
+                self.min_connections, self.max_connections,
+                connection_factory=PooledConnection, **self.config
+            )
             return True
         except Exception as e:
             logger.error(f"Database connection error: {str(e)}")
             return False
     
     def get_connection(self):
-        """Get the connection, reconnecting if necessary"""
-        if not self.conn or self.conn.closed:
+        """Check a connection out of the pool, creating the pool if necessary"""
+        if not self.pool or self.pool.closed:
             if not self._connect():
                 raise Exception("Failed to establish database connection")
-        return self.conn
+        conn = self.pool.getconn()
+        if conn.closed:
+            # Dropped while idle in the pool; swap it for a fresh connection
+            self.pool.putconn(conn, close=True)
+            conn = self.pool.getconn()
+        conn.autocommit = False
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection for the duration of a with-block"""
+        conn = self.get_connection()
+        broken = False
+        try:
+            yield conn
+        except CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            # Broken connections are closed instead of going back to the pool
+            self.pool.putconn(conn, close=broken or bool(conn.closed))
     
-    def execute_query(self, query: str, params: Optional[tuple] = None) -> Optional[List[tuple]]:
-        """Execute a database query with error handling and auto-reconnect"""
+    @contextmanager
+    def transaction(self):
+        """Borrow a pooled connection for a multi-statement transaction, committed on success"""
+        with self.connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    def execute_read(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """Run a query that returns rows (as dicts keyed by column name), with error handling and auto-reconnect"""
+        return self._execute(query, params, fetch="all", read_only=True)
+    
+    def execute_write(self, query: str, params: Optional[tuple] = None, returning: bool = False) -> Optional[tuple]:
+        """Run a statement and commit it; returns the RETURNING row when returning is set"""
+        return self._execute(query, params, fetch="one" if returning else "none")
+    
+    def execute_prepared(self, name: str, params: Optional[tuple] = None, fetch: str = "all") -> Any:
+        """Execute a statement from PREPARED_STATEMENTS (rows as dicts), preparing it on first use per connection"""
+        return self._execute(PREPARED_STATEMENTS[name], params, name, fetch, read_only=True)
+    
+    def _execute(self, query: str, params: Optional[tuple], statement: Optional[str] = None,
+                 fetch: str = "all", read_only: bool = False) -> Any:
         max_retries = 3
         retries = 0
         
         while retries < max_retries:
             try:
-                conn = self.get_connection()
-                with conn.cursor() as cursor:
-                    cursor.execute(query, params)
-                    if cursor.description:  # If query returns results
-                        result = cursor.fetchall()
-                    else:
-                        result = None
-                    conn.commit()
-                    return result
-            except psycopg2.OperationalError as e:
-                # Connection issue - attempts reconnect
+                with self.connection() as conn:
+                    # Reads run in autocommit so they skip the BEGIN/COMMIT round-trips;
+                    # get_connection switches it back off on the next checkout
+                    conn.autocommit = read_only
+                    try:
+                        # Reads build their row dicts in the driver; writes only need the RETURNING tuple
+                        cursor_factory = psycopg2.extras.RealDictCursor if read_only else None
+                        with conn.cursor(cursor_factory=cursor_factory) as cursor:
+                            if statement is None:
+                                cursor.execute(query, params)
+                            else:
+                                if statement not in conn.prepared:
+                                    cursor.execute(f"PREPARE {statement} AS {query}")
+                                    conn.prepared.add(statement)
+                                if params:
+                                    placeholders = ", ".join(["%s"] * len(params))
+                                    cursor.execute(f"EXECUTE {statement} ({placeholders})", params)
+                                else:
+                                    cursor.execute(f"EXECUTE {statement}")
+                            # The caller states what it expects back, so there is no need to inspect cursor.description
+                            if fetch == "all":
+                                result = cursor.fetchall()
+                            elif fetch == "one":
+                                result = cursor.fetchone()
+                            else:
+                                result = None
+                            if not read_only:
+                                conn.commit()
+                            return result
+                    except CONNECTION_ERRORS:
+                        raise
+                    except Exception as e:
+                        conn.rollback()
+                        logger.error(f"Query execution error: {str(e)}")
+                        logger.error(f"Failed query: {query}")
+                        if params:
+                            logger.error(f"Query parameters: {params}")
+                        raise
+            except CONNECTION_ERRORS as e:
+                # Connection issue - the broken connection was discarded, retry on a fresh one
                 logger.warning(f"Database connection lost, reconnecting... ({retries+1}/{max_retries})")
-                self.conn = None
                 retries += 1
                 if retries >= max_retries:
                     raise
-            except Exception as e:
-                conn.rollback()
-                logger.error(f"Query execution error: {str(e)}")
-                logger.error(f"Failed query: {query}")
-                if params:
-                    logger.error(f"Query parameters: {params}")
-                raise
         
         return None
     
     def close(self):
-        """Close the database connection"""
-        if self.conn and not self.conn.closed:
-            self.conn.close()
-            logger.info("Database connection closed")
+        """Close every pooled database connection"""
+        if self.pool and not self.pool.closed:
+            self.pool.closeall()
+            logger.info("Database connection pool closed")
 
 class DatabaseManager:
     """Database management class with connection pooling"""
@@ -208,92 +463,163 @@ class DatabaseManager:
     def test_connection(self) -> bool:
         """Test database connection"""
         try:
-            self.db.execute_query("SELECT 1;")
+            self.db.execute_read("SELECT 1;")
             logger.info("Database connection test successful")
             return True
         except Exception as e:
             logger.error(f"Database connection test failed: {str(e)}")
             return False
     
+    def missing_schema_objects(self) -> List[str]:
+        """Names of schema tables and indexes not yet in the database, found with one pg_class lookup"""
+        expected = list(SCHEMAS["tables"]) + list(SCHEMAS["indexes"])
+        result = self.db.execute_read(
+            "SELECT relname FROM pg_class WHERE relnamespace = 'public'::regnamespace AND relname = ANY(%s);",
+            (expected,)
+        )
+        found = {row['relname'] for row in result}
+        return [name for name in expected if name not in found]
+    
     def setup_database(self) -> bool:
         """Set up database schema"""
+        global _SCHEMA_READY
+        if _SCHEMA_READY:
+            return True
         try:
             # 1. Test connection
             if not self.test_connection():
                 return False
-                
-            # 2. Enabling extensions
-            for extension_query in SCHEMAS["extensions"]:
-                try:
-                    self.db.execute_query(extension_query)
-                    logger.info(f"Extension enabled: {extension_query}")
-                except Exception as e:
-                    logger.error(f"Failed to enable extension: {str(e)}")
-                    return False
             
-            # 3. Creating tables in order (respecting dependencies)
+            # 2. A database set up by an earlier run already has everything; skip the DDL
+            if not self.missing_schema_objects():
+                logger.info("Database schema already in place")
+                _SCHEMA_READY = True
+                return True
+                
+            # 3. Enabling extensions, creating tables in order (respecting dependencies) and then
+            # their indexes, sent as one batch so the whole schema costs a single round-trip and commit
             table_order = ["patients", "appointments", "treatments", "medical_history"]
+            ddl = "\n".join(
+                SCHEMAS["extensions"]
+                + [SCHEMAS["tables"][table_name] for table_name in table_order]
+                + list(SCHEMAS["indexes"].values())
+            )
+            try:
+                self.db.execute_write(ddl)
+                logger.info(f"Extensions enabled, tables and indexes created or verified: {', '.join(table_order)}")
+            except Exception as e:
+                logger.error(f"Failed to create database schema: {str(e)}")
+                return False
             
-            for table_name in table_order:
-                query = SCHEMAS["tables"][table_name]
-                try:
-                    self.db.execute_query(query)
-                    logger.info(f"Table created or verified: {table_name}")
-                except Exception as e:
-                    logger.error(f"Failed to create table {table_name}: {str(e)}")
-                    return False
-            
-            # 4. Verifing tables exist
-            verify_query = """
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = 'public' 
-            AND table_name IN ('patients', 'appointments', 'treatments', 'medical_history');
-            """
-            result = self.db.execute_query(verify_query)
-            
-            if result and len(result) == 4:
-                logger.info("All tables created and verified successfully")
-                return True
-            else:
-                found_tables = [row[0] for row in (result or [])]
-                missing = set(table_order) - set(found_tables)
-                logger.error(f"Table verification failed. Missing tables: {missing}")
+            # 4. Verifing tables and indexes exist
+            missing = self.missing_schema_objects()
+            if missing:
+                logger.error(f"Schema verification failed. Missing tables or indexes: {missing}")
                 return False
+            
+            logger.info("All tables created and verified successfully")
+            _SCHEMA_READY = True
+            return True
                 
         except Exception as e:
             logger.error(f"Database setup failed: {str(e)}")
             return False
 
+class AIResultCache:
+    """In-memory LRU cache of AI responses keyed by a hash of their inputs, with expiring entries"""
+    
+    def __init__(self, max_size: int = 128, ttl: float = 1800):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(kind: str, *inputs: str) -> str:
+        """Hash the kind of request and its inputs into a fixed-size key"""
+        # A JSON array keeps the field boundaries, so inputs containing the separator cannot collide
+        return hashlib.sha256(json.dumps([kind, *inputs]).encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None when it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key: str, value: str) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
 class AIService:
     """Handles AI-related operations"""
     
-    def __init__(self, config: Dict[str, str]):
+    def __init__(self, config: Mapping[str, str]):
         """Initialize AI service with configuration"""
         self.api_key = config.get("api_key")
         self.model_name = config.get("model_name", "gemini-2.0-flash")
         self.timeout = 30  # Set a timeout for API calls
+        self.max_attempts = 3  # Tries per call when the API reports a transient failure
+        self.cache = AIResultCache()
         
         # Configure Gemini API if API key is available
         if self.api_key:
+            # Imported here so the SDK only loads when AI is actually configured
+            import google.generativeai as genai
+            from google.api_core import exceptions as google_exceptions
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel(self.model_name)
+            # Rate limiting and server-side hiccups are worth retrying; bad requests and auth errors are not
+            self.transient_errors = (
+                google_exceptions.ResourceExhausted,
+                google_exceptions.ServiceUnavailable,
+                google_exceptions.InternalServerError,
+                google_exceptions.DeadlineExceeded
+            )
             logger.info(f"AI service initialized with model: {self.model_name}")
         else:
             self.model = None
+            self.transient_errors = ()
             logger.warning("AI service initialized without API key - analysis functions will be limited")
     
-    def analyze_patient_symptoms(self, symptoms: str) -> Dict[str, Any]:
-        """Analyze patient symptoms using Gemini AI"""
-        if not self.model:
-            logger.warning("AI analysis requested but no API key configured")
-            return {
-                'analysis': "AI analysis unavailable - no API key configured",
-                'timestamp': datetime.now().isoformat()
-            }
-            
-        try:
-            prompt = f"""
+    def _call_gemini(self, prompt: str, cache_key: str, use_cache: bool = True) -> str:
+        """Generate content for a prompt, reusing a cached response for the same inputs unless use_cache is False"""
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Run on the shared pool to implement a timeout; failures raise so they are never cached.
+        # Transient API errors are retried with exponential backoff (1s, 2s, ... capped at 8s), and
+        # every attempt and backoff shares the one timeout so a call never outlasts self.timeout
+        deadline = time.monotonic() + self.timeout
+        for attempt in range(1, self.max_attempts + 1):
+            future = AI_EXECUTOR.submit(self.model.generate_content, prompt)
+            try:
+                response = future.result(timeout=max(deadline - time.monotonic(), 0))
+                break
+            except self.transient_errors as e:
+                delay = min(2 ** (attempt - 1), 8)
+                if attempt == self.max_attempts or time.monotonic() + delay >= deadline:
+                    raise
+                logger.warning(f"AI request failed ({str(e)}), retrying in {delay}s ({attempt}/{self.max_attempts})")
+                time.sleep(delay)
+        text = response.text if hasattr(response, 'text') else str(response)
+        self.cache.put(cache_key, text)
+        return text
+    
+    def fetch_symptom_analysis(self, symptoms: str, use_cache: bool = True) -> str:
+        """Return Gemini's analysis of the symptoms; raises when the call times out or fails"""
+        prompt = f"""
             As a medical AI assistant, analyze these symptoms and provide YOUR OWN original analysis with:
             1. Three possible conditions that might cause these symptoms (general possibilities only, not specific diagnoses)
             2. Two general categories of tests that might be appropriate (not specific branded tests)
@@ -303,48 +629,33 @@ class AIService:
             
             Symptoms: {symptoms}
             """
+        return self._call_gemini(prompt, AIResultCache.make_key("symptoms", symptoms), use_cache)
+    
+    def analyze_patient_symptoms(self, symptoms: str) -> Dict[str, Any]:
+        """Analyze patient symptoms using Gemini AI"""
+        if not self.model:
+            logger.warning("AI analysis requested but no API key configured")
+            return {
+                'analysis': "AI analysis unavailable - no API key configured",
+                'timestamp': datetime.now().isoformat()
+            }
             
-            # Adding timeout to prevent hanging
-            import threading
-            import time
-            from concurrent.futures import ThreadPoolExecutor, TimeoutError
-            
-            # Function to generate content with a model
-            def generate_with_timeout():
-                try:
-                    return self.model.generate_content(prompt)
-                except Exception as e:
-                    logger.error(f"Error in AI generation: {str(e)}")
-                    return None
-            
-            # Using a thread pool to implement a timeout
-            with ThreadPoolExecutor() as executor:
-                future = executor.submit(generate_with_timeout)
-                try:
-                    response = future.result(timeout=self.timeout)
-                    if response:
-                        return {
-                            'analysis': response.text if hasattr(response, 'text') else str(response),
-                            'timestamp': datetime.now().isoformat()
-                        }
-                    else:
-                        return {
-                            'analysis': "AI analysis could not be generated due to an error with the AI service.",
-                            'timestamp': datetime.now().isoformat()
-                        }
-                except TimeoutError:
-                    logger.error(f"AI analysis timed out after {self.timeout} seconds")
-                    return {
-                        'analysis': f"AI analysis timed out after {self.timeout} seconds. Please try again later.",
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
+        try:
+            return {
+                'analysis': self.fetch_symptom_analysis(symptoms),
+                'timestamp': datetime.now().isoformat()
+            }
+        except TimeoutError:
+            logger.error(f"AI analysis timed out after {self.timeout} seconds")
+            return {
+                'analysis': f"AI analysis timed out after {self.timeout} seconds. Please try again later.",
+                'timestamp': datetime.now().isoformat()
+            }
         except Exception as e:
-            logger.error(f"AI analysis failed: {str(e)}")
+            logger.error(f"Error in AI generation: {str(e)}")
             return {
-                'error': str(e),
-                'timestamp': datetime.now().isoformat(),
-                'analysis': "AI analysis could not be generated due to an error."
+                'analysis': "AI analysis could not be generated due to an error with the AI service.",
+                'timestamp': datetime.now().isoformat()
             }
 
     def generate_treatment_plan(self, condition: str, patient_history: str) -> Dict[str, Any]:
@@ -371,40 +682,25 @@ class AIService:
             Be brief and completely generic, avoiding any specific commercial products, brand names, or references to medical literature.
             """
             
-            # Add timeout to prevent hanging
-            import threading
-            import time
-            from concurrent.futures import ThreadPoolExecutor, TimeoutError
-            
-            # Function to generate content with a model
-            def generate_with_timeout():
-                try:
-                    return self.model.generate_content(prompt)
-                except Exception as e:
-                    logger.error(f"Error in AI generation: {str(e)}")
-                    return None
-            
-            # Using a thread pool to implement a timeout
-            with ThreadPoolExecutor() as executor:
-                future = executor.submit(generate_with_timeout)
-                try:
-                    response = future.result(timeout=self.timeout)
-                    if response:
-                        return {
-                            'treatment_plan': response.text if hasattr(response, 'text') else str(response),
-                            'timestamp': datetime.now().isoformat()
-                        }
-                    else:
-                        return {
-                            'treatment_plan': "AI treatment plan could not be generated due to an error with the AI service.",
-                            'timestamp': datetime.now().isoformat()
-                        }
-                except TimeoutError:
-                    logger.error(f"Treatment plan generation timed out after {self.timeout} seconds")
-                    return {
-                        'treatment_plan': f"Treatment plan generation timed out after {self.timeout} seconds. Please try again later.",
-                        'timestamp': datetime.now().isoformat()
-                    }
+            try:
+                return {
+                    'treatment_plan': self._call_gemini(
+                        prompt, AIResultCache.make_key("treatment_plan", condition, patient_history)
+                    ),
+                    'timestamp': datetime.now().isoformat()
+                }
+            except TimeoutError:
+                logger.error(f"Treatment plan generation timed out after {self.timeout} seconds")
+                return {
+                    'treatment_plan': f"Treatment plan generation timed out after {self.timeout} seconds. Please try again later.",
+                    'timestamp': datetime.now().isoformat()
+                }
+            except Exception as e:
+                logger.error(f"Error in AI generation: {str(e)}")
+                return {
+                    'treatment_plan': "AI treatment plan could not be generated due to an error with the AI service.",
+                    'timestamp': datetime.now().isoformat()
+                }
         except Exception as e:
             logger.error(f"Treatment plan generation failed: {str(e)}")
             return {
@@ -434,9 +730,9 @@ class PatientRepository:
                 patient_data['phone'],
                 patient_data.get('email')
             )
-            result = self.db.db.execute_query(query, params)
-            if result and result[0]:
-                patient_id = result[0][0]
+            result = self.db.db.execute_write(query, params, returning=True)
+            if result:
+                patient_id = result[0]
                 logger.info(f"Patient added successfully with ID: {patient_id}")
                 return patient_id
             return None
@@ -444,25 +740,91 @@ class PatientRepository:
             logger.error(f"Failed to add patient: {str(e)}")
             return None
     
+    def bulk_add_patients(self, patients: List[Dict[str, Any]]) -> List[int]:
+        """Add many patients in one transaction via COPY into a staging table; returns their IDs in order"""
+        if not patients:
+            return []
+        
+        # row_no keeps the returned IDs in the same order as the input
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for row_no, patient in enumerate(patients):
+            writer.writerow((
+                row_no,
+                patient['first_name'],
+                patient['last_name'],
+                patient['dob'],
+                patient['phone'],
+                patient.get('email')  # None is written as an empty (NULL) field
+            ))
+        buffer.seek(0)
+        
+        try:
+            with self.db.db.transaction() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                    CREATE TEMP TABLE patients_stage (
+                        row_no INTEGER,
+                        first_name VARCHAR(100),
+                        last_name VARCHAR(100),
+                        dob DATE,
+                        phone VARCHAR(20),
+                        email VARCHAR(100)
+                    ) ON COMMIT DROP;
+                    """)
+                    cursor.copy_expert(
+                        "COPY patients_stage (row_no, first_name, last_name, dob, phone, email) FROM STDIN WITH (FORMAT csv)",
+                        buffer
+                    )
+                    cursor.execute("""
+                    INSERT INTO patients (first_name, last_name, dob, phone, email)
+                    SELECT first_name, last_name, dob, phone, email
+                    FROM patients_stage
+                    ORDER BY row_no
+                    RETURNING id;
+                    """)
+                    patient_ids = [row[0] for row in cursor.fetchall()]
+            logger.info(f"Bulk added {len(patient_ids)} patients")
+            return patient_ids
+        except Exception as e:
+            logger.error(f"Failed to bulk add patients: {str(e)}")
+            return []
+    
     def get_patient(self, patient_id: int) -> Optional[Dict[str, Any]]:
         """Retrieve a patient by ID"""
-        query = "SELECT * FROM patients WHERE id = %s;"
         try:
-            result = self.db.db.execute_query(query, (patient_id,))
-            if result and result[0]:
-                return {
-                    'id': result[0][0],
-                    'first_name': result[0][1],
-                    'last_name': result[0][2],
-                    'dob': result[0][3],
-                    'phone': result[0][4],
-                    'email': result[0][5]
-                }
-            return None
+            return self.db.db.execute_prepared("patient_by_id", (patient_id,), fetch="one")
         except Exception as e:
             logger.error(f"Failed to get patient: {str(e)}")
             return None
     
+    def patient_exists(self, patient_id: int) -> bool:
+        """Check whether a patient exists without fetching the row"""
+        try:
+            result = self.db.db.execute_prepared("patient_exists", (patient_id,), fetch="one")
+            return bool(result and result['found'])
+        except Exception as e:
+            logger.error(f"Failed to check patient: {str(e)}")
+            return False
+    
+    def get_patient_dashboard(self, patient_id: int, limit: int = 20) -> Optional[Dict[str, Any]]:
+        """Retrieve a patient with upcoming appointments, recent treatments and history in a single query"""
+        try:
+            result = self.db.db.execute_prepared("patient_dashboard", (patient_id, limit), fetch="one")
+            if not result:
+                return None
+            # Nested rows come back as JSON, so their timestamps are fixed-width ISO strings
+            for appointment in result['appointments']:
+                appointment['appointment_date'] = datetime.fromisoformat(appointment['appointment_date'])
+            for treatment in result['treatments']:
+                treatment['created_at'] = datetime.fromisoformat(treatment['created_at'])
+            for record in result['medical_history']:
+                record['visit_date'] = datetime.fromisoformat(record['visit_date'])
+            return result
+        except Exception as e:
+            logger.error(f"Failed to get patient dashboard: {str(e)}")
+            return None
+    
     def update_patient(self, patient_id: int, update_data: Dict[str, Any]) -> bool:
         """Update patient information"""
         try:
@@ -484,7 +846,7 @@ class PatientRepository:
             RETURNING id;
             """
             
-            result = self.db.db.execute_query(query, tuple(params))
+            result = self.db.db.execute_write(query, tuple(params), returning=True)
             if result:
                 logger.info(f"Patient {patient_id} updated successfully")
                 return True
@@ -497,7 +859,7 @@ class PatientRepository:
         """Delete a patient record"""
         query = "DELETE FROM patients WHERE id = %s RETURNING id;"
         try:
-            result = self.db.db.execute_query(query, (patient_id,))
+            result = self.db.db.execute_write(query, (patient_id,), returning=True)
             if result:
                 logger.info(f"Patient {patient_id} deleted successfully")
                 return True
@@ -508,22 +870,24 @@ class PatientRepository:
     
     def list_patients(self) -> List[Dict[str, Any]]:
         """List all patients"""
-        query = "SELECT * FROM patients ORDER BY last_name, first_name;"
+        query = "SELECT id, first_name, last_name, dob, phone, email FROM patients ORDER BY last_name, first_name;"
         try:
-            result = self.db.db.execute_query(query)
-            if result:
-                return [{
-                    'id': row[0],
-                    'first_name': row[1],
-                    'last_name': row[2],
-                    'dob': row[3],
-                    'phone': row[4],
-                    'email': row[5]
-                } for row in result]
-            return []
+            return self.db.db.execute_read(query) or []
         except Exception as e:
             logger.error(f"Failed to list patients: {str(e)}")
             return []
+    
+    def list_patients_columnar(self) -> Dict[str, List[Any]]:
+        """List all patients as parallel per-column lists instead of one dict per patient"""
+        columns = ('id', 'first_name', 'last_name', 'dob', 'phone', 'email')
+        query = "SELECT id, first_name, last_name, dob, phone, email FROM patients ORDER BY last_name, first_name;"
+        try:
+            result = self.db.db.execute_read(query)
+            values = zip(*(row.values() for row in result)) if result else [()] * len(columns)
+            return {name: list(column) for name, column in zip(columns, values)}
+        except Exception as e:
+            logger.error(f"Failed to list patients: {str(e)}")
+            return {name: [] for name in columns}
 
 class AppointmentRepository:
     """Data access layer for appointment-related operations"""
@@ -544,33 +908,41 @@ class AppointmentRepository:
                 appointment_data['appointment_date'],
                 appointment_data.get('purpose', '')
             )
-            result = self.db.db.execute_query(query, params)
+            result = self.db.db.execute_write(query, params, returning=True)
             if result:
-                logger.info(f"Appointment scheduled successfully with ID: {result[0][0]}")
+                logger.info(f"Appointment scheduled successfully with ID: {result[0]}")
                 return True
             return False
         except Exception as e:
             logger.error(f"Failed to schedule appointment: {str(e)}")
             return False
     
+    def bulk_schedule_appointments(self, appointments: List[Dict[str, Any]]) -> List[str]:
+        """Schedule many appointments with multi-row INSERTs; returns their IDs in order"""
+        if not appointments:
+            return []
+        rows = [(a['patient_id'], a['appointment_date'], a.get('purpose', '')) for a in appointments]
+        try:
+            with self.db.db.transaction() as conn:
+                with conn.cursor() as cursor:
+                    result = psycopg2.extras.execute_values(
+                        cursor,
+                        "INSERT INTO appointments (patient_id, appointment_date, purpose) VALUES %s RETURNING id",
+                        rows,
+                        page_size=1000,
+                        fetch=True
+                    )
+            appointment_ids = [row[0] for row in result]
+            logger.info(f"Bulk scheduled {len(appointment_ids)} appointments")
+            return appointment_ids
+        except Exception as e:
+            logger.error(f"Failed to bulk schedule appointments: {str(e)}")
+            return []
+    
     def get_patient_appointments(self, patient_id: int) -> List[Dict[str, Any]]:
         """Get all appointments for a patient"""
-        query = """
-        SELECT id, appointment_date, purpose, status
-        FROM appointments
-        WHERE patient_id = %s
-        ORDER BY appointment_date;
-        """
         try:
-            result = self.db.db.execute_query(query, (patient_id,))
-            if result:
-                return [{
-                    'id': row[0],
-                    'appointment_date': row[1],
-                    'purpose': row[2],
-                    'status': row[3]
-                } for row in result]
-            return []
+            return self.db.db.execute_prepared("appointments_by_patient", (patient_id,)) or []
         except Exception as e:
             logger.error(f"Failed to get appointments: {str(e)}")
             return []
@@ -585,10 +957,6 @@ class TreatmentRepository:
                      ai_analysis: Dict[str, Any], treatment_plan: Dict[str, Any]) -> bool:
         """Add a new treatment record with AI analysis"""
         try:
-            # Convert dictionary to JSON string if needed
-            ai_analysis_json = json.dumps(ai_analysis) if isinstance(ai_analysis, dict) else ai_analysis
-            treatment_plan_json = json.dumps(treatment_plan) if isinstance(treatment_plan, dict) else treatment_plan
-            
             query = """
             INSERT INTO treatments (
                 patient_id, condition, symptoms, ai_analysis, treatment_plan
@@ -600,59 +968,91 @@ class TreatmentRepository:
                 patient_id,
                 condition,
                 symptoms,
-                ai_analysis_json,
-                treatment_plan_json
+                ai_analysis,  # dicts are adapted to JSON by the driver
+                treatment_plan
             )
             
-            result = self.db.db.execute_query(query, params)
+            result = self.db.db.execute_write(query, params, returning=True)
             if result:
-                logger.info(f"Treatment added successfully with ID: {result[0][0]}")
+                logger.info(f"Treatment added successfully with ID: {result[0]}")
                 return True
             return False
         except Exception as e:
             logger.error(f"Failed to add treatment: {str(e)}")
             return False
     
+    def bulk_add_treatments(self, treatments: List[Dict[str, Any]]) -> int:
+        """Add many treatment records with a single binary COPY; returns the number added"""
+        if not treatments:
+            return 0
+        # Stored treatments always carry both AI dicts; missing ones get add_treatment's placeholders
+        timestamp = datetime.now().isoformat()
+        no_analysis = {"analysis": "No analysis available", "timestamp": timestamp}
+        no_plan = {"treatment_plan": "No treatment plan available", "timestamp": timestamp}
+        buffer = binary_copy_buffer(
+            [(t['patient_id'], t['condition'], t.get('symptoms'),
+              t.get('ai_analysis') or no_analysis, t.get('treatment_plan') or no_plan)
+             for t in treatments],
+            [copy_int4, copy_text, copy_text, copy_jsonb, copy_jsonb]
+        )
+        try:
+            with self.db.db.transaction() as conn:
+                with conn.cursor() as cursor:
+                    cursor.copy_expert(
+                        "COPY treatments (patient_id, condition, symptoms, ai_analysis, treatment_plan) "
+                        "FROM STDIN WITH (FORMAT binary)",
+                        buffer
+                    )
+                    count = cursor.rowcount
+            logger.info(f"Bulk added {count} treatments")
+            return count
+        except Exception as e:
+            logger.error(f"Failed to bulk add treatments: {str(e)}")
+            return 0
+    
     def get_patient_treatments(self, patient_id: int) -> List[Dict[str, Any]]:
         """Get all treatments for a patient"""
-        query = """
-        SELECT id, condition, symptoms, ai_analysis, treatment_plan, status, created_at
-        FROM treatments
-        WHERE patient_id = %s
-        ORDER BY created_at DESC;
-        """
         try:
-            result = self.db.db.execute_query(query, (patient_id,))
-            if result:
-                treatments = []
-                for row in result:
-                    # Safely parse JSON data
-                    try:
-                        ai_analysis = json.loads(row[3]) if row[3] else None
-                    except Exception as e:
-                        logger.warning(f"Failed to parse AI analysis JSON: {str(e)}")
-                        ai_analysis = {"error": "Failed to parse AI analysis data"}
-                    
-                    try:
-                        treatment_plan = json.loads(row[4]) if row[4] else None
-                    except Exception as e:
-                        logger.warning(f"Failed to parse treatment plan JSON: {str(e)}")
-                        treatment_plan = {"error": "Failed to parse treatment plan data"}
-                    
-                    treatments.append({
-                        'id': row[0],
-                        'condition': row[1],
-                        'symptoms': row[2],
-                        'ai_analysis': ai_analysis,
-                        'treatment_plan': treatment_plan,
-                        'status': row[5],
-                        'created_at': row[6]
-                    })
-                return treatments
+            # jsonb columns arrive already decoded by the module-level orjson loader
+            return self.db.db.execute_prepared("treatments_by_patient", (patient_id,)) or []
+        except Exception as e:
+            logger.error(f"Failed to get treatments: {str(e)}")
             return []
+    
+    def get_treatments_for_patients(self, patient_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get the id, condition and symptoms of every treatment belonging to the given patients"""
+        query = "SELECT id, patient_id, condition, symptoms FROM treatments WHERE patient_id = ANY(%s) ORDER BY created_at;"
+        try:
+            return self.db.db.execute_read(query, (list(patient_ids),)) or []
         except Exception as e:
             logger.error(f"Failed to get treatments: {str(e)}")
             return []
+    
+    def bulk_update_ai_analyses(self, results: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Replace the AI analysis of many treatments in one statement; returns the number updated"""
+        if not results:
+            return 0
+        try:
+            with self.db.db.transaction() as conn:
+                with conn.cursor() as cursor:
+                    psycopg2.extras.execute_values(
+                        cursor,
+                        """
+                        UPDATE treatments AS t
+                        SET ai_analysis = v.ai_analysis, updated_at = CURRENT_TIMESTAMP
+                        FROM (VALUES %s) AS v (id, ai_analysis)
+                        WHERE t.id = v.id
+                        """,
+                        results,
+                        template="(%s::uuid, %s::jsonb)",
+                        page_size=1000
+                    )
+                    count = cursor.rowcount
+            logger.info(f"Updated AI analyses for {count} treatments")
+            return count
+        except Exception as e:
+            logger.error(f"Failed to update AI analyses: {str(e)}")
+            return 0
 
 class MedicalHistoryRepository:
     """Data access layer for medical history operations"""
@@ -676,34 +1076,45 @@ class MedicalHistoryRepository:
                 history_data.get('treatment', ''),
                 history_data.get('notes', '')
             )
-            result = self.db.db.execute_query(query, params)
+            result = self.db.db.execute_write(query, params, returning=True)
             if result:
-                logger.info(f"Medical history added successfully with ID: {result[0][0]}")
+                logger.info(f"Medical history added successfully with ID: {result[0]}")
                 return True
             return False
         except Exception as e:
             logger.error(f"Failed to add medical history: {str(e)}")
             return False
     
-    def get_patient_medical_history(self, patient_id: int) -> List[Dict[str, Any]]:
-        """Get medical history for a patient"""
-        query = """
-        SELECT id, visit_date, diagnosis, treatment, notes
-        FROM medical_history
-        WHERE patient_id = %s
-        ORDER BY visit_date DESC;
-        """
+    def bulk_add_medical_history(self, records: List[Dict[str, Any]]) -> int:
+        """Add many medical history records with a single binary COPY; returns the number added"""
+        if not records:
+            return 0
+        buffer = binary_copy_buffer(
+            [(r['patient_id'], r['visit_date'], r.get('diagnosis', ''), r.get('treatment', ''), r.get('notes', ''))
+             for r in records],
+            [copy_int4, copy_timestamp, copy_text, copy_text, copy_text]
+        )
         try:
-            result = self.db.db.execute_query(query, (patient_id,))
-            if result:
-                return [{
-                    'id': row[0],
-                    'visit_date': row[1],
-                    'diagnosis': row[2],
-                    'treatment': row[3],
-                    'notes': row[4]
-                } for row in result]
-            return []
+            with self.db.db.transaction() as conn:
+                with conn.cursor() as cursor:
+                    cursor.copy_expert(
+                        "COPY medical_history (patient_id, visit_date, diagnosis, treatment, notes) "
+                        "FROM STDIN WITH (FORMAT binary)",
+                        buffer
+                    )
+                    count = cursor.rowcount
+            logger.info(f"Bulk added {count} medical history records")
+            return count
+        except Exception as e:
+            logger.error(f"Failed to bulk add medical history: {str(e)}")
+            return 0
+    
+    def get_patient_medical_history(self, patient_id: int, limit: Optional[int] = None,
+                                    offset: int = 0) -> List[Dict[str, Any]]:
+        """Get a page of medical history for a patient (every record when limit is None)"""
+        try:
+            # A NULL limit means no limit
+            return self.db.db.execute_prepared("medical_history_by_patient", (patient_id, limit, offset)) or []
         except Exception as e:
             logger.error(f"Failed to get medical history: {str(e)}")
             return []
@@ -722,16 +1133,35 @@ class PatientService:
         self.treatment_repo = treatment_repo
         self.medical_history_repo = medical_history_repo
         self.ai = ai_service
+        # Runs treatment requests (AI calls + save) for callers that must not block
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="treatment")
+        # Generates treatment plans alongside the symptom analysis; separate from the pool above and
+        # AI_EXECUTOR so a waiting treatment request can never starve the calls it is waiting on
+        self._plan_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="treatment-plan")
+        # Bulk re-analysis gets its own pool so a large batch never queues interactive treatment requests
+        self._reanalysis_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="reanalysis")
     
     def add_patient(self, patient_data: Dict[str, Any]) -> bool:
         """Add a new patient"""
         patient_id = self.patient_repo.add_patient(patient_data)
         return patient_id is not None
     
+    def bulk_add_patients(self, patients: List[Dict[str, Any]]) -> List[int]:
+        """Add many patients at once and return their new IDs"""
+        return self.patient_repo.bulk_add_patients(patients)
+    
     def get_patient(self, patient_id: int) -> Optional[Dict[str, Any]]:
         """Get patient details"""
         return self.patient_repo.get_patient(patient_id)
     
+    def patient_exists(self, patient_id: int) -> bool:
+        """Check whether a patient exists"""
+        return self.patient_repo.patient_exists(patient_id)
+    
+    def get_patient_dashboard(self, patient_id: int, limit: int = 20) -> Optional[Dict[str, Any]]:
+        """Get a patient with upcoming appointments, recent treatments and medical history (up to limit each)"""
+        return self.patient_repo.get_patient_dashboard(patient_id, limit)
+    
     def update_patient(self, patient_id: int, update_data: Dict[str, Any]) -> bool:
         """Update patient information"""
         return self.patient_repo.update_patient(patient_id, update_data)
@@ -744,10 +1174,18 @@ class PatientService:
         """List all patients"""
         return self.patient_repo.list_patients()
     
+    def list_patients_columnar(self) -> Dict[str, List[Any]]:
+        """List all patients as a dict of column lists, for large listings"""
+        return self.patient_repo.list_patients_columnar()
+    
     def schedule_appointment(self, patient_id: int, appointment_data: Dict[str, Any]) -> bool:
         """Schedule a new appointment"""
         return self.appointment_repo.schedule_appointment(patient_id, appointment_data)
     
+    def bulk_schedule_appointments(self, appointments: List[Dict[str, Any]]) -> List[str]:
+        """Schedule many appointments at once, each dict carrying its patient_id"""
+        return self.appointment_repo.bulk_schedule_appointments(appointments)
+    
     def get_patient_appointments(self, patient_id: int) -> List[Dict[str, Any]]:
         """Get all appointments for a patient"""
         return self.appointment_repo.get_patient_appointments(patient_id)
@@ -758,29 +1196,34 @@ class PatientService:
         treatment_plan = {"treatment_plan": "No treatment plan available", "timestamp": datetime.now().isoformat()}
         
         try:
-            # Get AI analysis
-            logger.info(f"Generating AI analysis for patient {patient_id}")
-            print("\nGenerating AI analysis of symptoms...")
+            # The two AI calls are independent, so the treatment plan is generated while
+            # the symptoms are analyzed instead of after
+            logger.info("Generating AI analysis and treatment plan for patient %s", patient_id)
+            print("\nGenerating AI analysis of symptoms and treatment plan...")
+            plan_future = self._plan_executor.submit(
+                self.ai.generate_treatment_plan,
+                treatment_data['condition'],
+                treatment_data.get('patient_history', '')
+            )
             ai_analysis = self.ai.analyze_patient_symptoms(treatment_data['symptoms'])
             
             # Check if analysis was successful
             if 'error' in ai_analysis:
-                logger.warning(f"AI analysis returned an error: {ai_analysis.get('error')}")
+                logger.warning("AI analysis returned an error: %s", ai_analysis.get('error'))
             
-            # Get treatment plan
-            logger.info(f"Generating AI treatment plan for patient {patient_id}")
-            print("\nGenerating AI treatment plan...")
-            treatment_plan = self.ai.generate_treatment_plan(
-                treatment_data['condition'],
-                treatment_data.get('patient_history', '')
-            )
+            treatment_plan = plan_future.result()
             
             # Check if treatment plan was successful
             if 'error' in treatment_plan:
-                logger.warning(f"AI treatment plan returned an error: {treatment_plan.get('error')}")
+                logger.warning("AI treatment plan returned an error: %s", treatment_plan.get('error'))
+            
+            # Pre-format the display timestamp once so listings don't re-parse it on every render
+            display_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ai_analysis['_display_ts'] = display_ts
+            treatment_plan['_display_ts'] = display_ts
             
             # Store AI responses in the database
-            logger.info(f"Saving treatment data to database for patient {patient_id}")
+            logger.info("Saving treatment data to database for patient %s", patient_id)
             success = self.treatment_repo.add_treatment(
                 patient_id,
                 treatment_data['condition'],
@@ -790,14 +1233,14 @@ class PatientService:
             )
             
             if not success:
-                logger.error(f"Failed to save treatment data for patient {patient_id}")
+                logger.error("Failed to save treatment data for patient %s", patient_id)
             
             # Return the success status and the AI responses
             return success, ai_analysis, treatment_plan
             
         except Exception as e:
             error_msg = str(e)
-            logger.error(f"Error in add_treatment service: {error_msg}")
+            logger.error("Error in add_treatment service: %s", error_msg)
             
             # Provide helpful error messages in the analysis and treatment plan
             ai_analysis = {
@@ -814,22 +1257,97 @@ class PatientService:
             
             return False, ai_analysis, treatment_plan
     
+    def add_treatment_async(self, patient_id: int, treatment_data: Dict[str, Any]) -> Future:
+        """Add a treatment in the background; the future resolves to add_treatment's result"""
+        return self._executor.submit(self.add_treatment, patient_id, dict(treatment_data))
+    
     def get_patient_treatments(self, patient_id: int) -> List[Dict[str, Any]]:
         """Get all treatments for a patient"""
         return self.treatment_repo.get_patient_treatments(patient_id)
     
+    def bulk_reanalyze_treatments(self, patient_ids: List[int]) -> int:
+        """Regenerate the AI analysis of the given patients' stored treatments; returns the number updated"""
+        if not self.ai.model:
+            logger.warning("AI re-analysis requested but no API key configured")
+            return 0
+        treatments = self.treatment_repo.get_treatments_for_patients(patient_ids)
+        if not treatments:
+            return 0
+        
+        # Plans are left alone: the patient history they were generated from is not stored,
+        # and regenerating without it would replace them with history-less plans
+        # Queue every request at once; the re-analysis pool bounds how many reach the API together.
+        # The cache is bypassed so a recent analysis of the same symptoms is not simply written back
+        logger.info("Regenerating AI analyses for %d treatments", len(treatments))
+        analyses = [self._reanalysis_executor.submit(self.ai.fetch_symptom_analysis, t['symptoms'] or '', False)
+                    for t in treatments]
+        
+        results = []
+        display_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for treatment, analysis_future in zip(treatments, analyses):
+            # Keep the stored analysis rather than overwrite it with a failure message
+            try:
+                analysis = analysis_future.result()
+            except Exception as e:
+                logger.warning("Skipping treatment %s: AI regeneration failed (%s)", treatment['id'], e)
+                continue
+            ai_analysis = {
+                'analysis': analysis,
+                'timestamp': datetime.now().isoformat(),
+                '_display_ts': display_ts
+            }
+            results.append((treatment['id'], ai_analysis))
+        
+        return self.treatment_repo.bulk_update_ai_analyses(results)
+    
     def add_medical_history(self, patient_id: int, history_data: Dict[str, Any]) -> bool:
         """Add medical history record"""
         return self.medical_history_repo.add_medical_history(patient_id, history_data)
     
-    def get_patient_medical_history(self, patient_id: int) -> List[Dict[str, Any]]:
-        """Get medical history for a patient"""
-        return self.medical_history_repo.get_patient_medical_history(patient_id)
+    def bulk_add_treatments(self, treatments: List[Dict[str, Any]]) -> int:
+        """Add many treatment records at once, without AI analysis"""
+        return self.treatment_repo.bulk_add_treatments(treatments)
+    
+    def bulk_add_medical_history(self, records: List[Dict[str, Any]]) -> int:
+        """Add many medical history records at once"""
+        return self.medical_history_repo.bulk_add_medical_history(records)
+    
+    def get_patient_medical_history(self, patient_id: int, limit: Optional[int] = None,
+                                    offset: int = 0) -> List[Dict[str, Any]]:
+        """Get a page of medical history for a patient (every record when limit is None)"""
+        return self.medical_history_repo.get_patient_medical_history(patient_id, limit, offset)
 
 class UserInterface:
     """Handles user interaction"""
     def __init__(self, patient_service: PatientService):
         self.service = patient_service
+        # Menu choice -> handler; each menu's exit choice is checked before dispatch
+        self._main_actions = {
+            '1': self.handle_patient_management,
+            '2': self.handle_appointment_management,
+            '3': self.handle_treatment_management,
+            '4': self.handle_medical_history
+        }
+        self._patient_actions = {
+            '1': self._add_patient,
+            '2': self._view_patient,
+            '3': self._update_patient,
+            '4': self._delete_patient,
+            '5': self._list_patients,
+            '6': self._view_dashboard
+        }
+        self._appointment_actions = {
+            '1': self._schedule_appointment,
+            '2': self._view_appointments
+        }
+        self._treatment_actions = {
+            '1': self._add_treatment,
+            '2': self._view_treatments
+        }
+        self._medical_history_actions = {
+            '1': self._add_medical_history,
+            '2': self._view_medical_history
+        }
 
     def display_menu(self):
         """Display the main menu"""
@@ -849,8 +1367,9 @@ class UserInterface:
         print("3. Update Patient")
         print("4. Delete Patient")
         print("5. List All Patients")
-        print("6. Back to Main Menu")
-        return input("Enter your choice (1-6): ")
+        print("6. Patient Dashboard")
+        print("7. Back to Main Menu")
+        return input("Enter your choice (1-7): ")
 
     def appointment_management_menu(self):
         """Display appointment management menu"""
@@ -876,319 +1395,368 @@ class UserInterface:
         print("3. Back to Main Menu")
         return input("Enter your choice (1-3): ")
 
+    @staticmethod
+    def _prompt(label: str) -> str:
+        """Read one form field straight from stdin, skipping input()'s readline machinery"""
+        sys.stdout.write(label)
+        sys.stdout.flush()
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError  # Same end-of-input behaviour as input()
+        return line.rstrip('\n')
+
     def get_patient_data(self) -> Dict[str, Any]:
         """Get patient information from user"""
         return {
-            'first_name': input("Enter first name: "),
-            'last_name': input("Enter last name: "),
-            'dob': input("Enter date of birth (YYYY-MM-DD): "),
-            'phone': input("Enter phone number: "),
-            'email': input("Enter email (optional): ")
+            'first_name': self._prompt("Enter first name: "),
+            'last_name': self._prompt("Enter last name: "),
+            'dob': self._prompt("Enter date of birth (YYYY-MM-DD): "),
+            'phone': self._prompt("Enter phone number: "),
+            'email': self._prompt("Enter email (optional): ")
         }
 
     def get_appointment_data(self) -> Dict[str, Any]:
         """Get appointment information from user"""
         return {
-            'appointment_date': input("Enter appointment date and time (YYYY-MM-DD HH:MM): "),
-            'purpose': input("Enter appointment purpose: ")
+            'appointment_date': self._prompt("Enter appointment date and time (YYYY-MM-DD HH:MM): "),
+            'purpose': self._prompt("Enter appointment purpose: ")
         }
 
     def get_treatment_data(self) -> Dict[str, Any]:
         """Get treatment information from user"""
         return {
-            'condition': input("Enter medical condition: "),
-            'symptoms': input("Enter symptoms (comma-separated): "),
-            'patient_history': input("Enter relevant patient history (optional): ")
+            'condition': self._prompt("Enter medical condition: "),
+            'symptoms': self._prompt("Enter symptoms (comma-separated): "),
+            'patient_history': self._prompt("Enter relevant patient history (optional): ")
         }
 
     def get_medical_history_data(self) -> Dict[str, Any]:
         """Get medical history information from user"""
         return {
-            'visit_date': input("Enter visit date (YYYY-MM-DD): "),
-            'diagnosis': input("Enter diagnosis: "),
-            'treatment': input("Enter treatment: "),
-            'notes': input("Enter additional notes: ")
+            'visit_date': self._prompt("Enter visit date (YYYY-MM-DD): "),
+            'diagnosis': self._prompt("Enter diagnosis: "),
+            'treatment': self._prompt("Enter treatment: "),
+            'notes': self._prompt("Enter additional notes: ")
         }
 
-    def display_ai_analysis(self, ai_analysis: Dict[str, Any]):
-        """Display AI analysis in a structured way"""
-        print("\n" + "="*60)
-        print(" "*20 + "AI SYMPTOM ANALYSIS")
-        print("="*60)
+    @staticmethod
+    def _write_lines(lines: List[str]):
+        """Write a block of output with a single write and flush instead of a print per line"""
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+    
+    def _format_structured(self, data: Dict[str, Any], header: str, key: str, error_label: str,
+                           label: str, generated_label: str) -> List[str]:
+        """Lay out an AI response's numbered points and headers as output lines"""
+        parts = [header]
         
-        if 'error' in ai_analysis:
-            print(f"Error generating analysis: {ai_analysis['error']}")
-            return
-            
-        if 'analysis' in ai_analysis:
-            # Format the analysis text
-            analysis_text = ai_analysis['analysis']
-            
-            # Try to structure the output by looking for numbered points
-            import re
+        if 'error' in data:
+            parts.append(f"Error generating {error_label}: {data['error']}")
+            return parts
             
-            # Split by lines
-            lines = analysis_text.strip().split('\n')
-            
-            # Print each line with proper formatting
-            for line in lines:
-                line = line.strip()
+        if key in data:
+            # Walk the text line by line without splitting it into a list first
+            for raw_line in io.StringIO(data[key]):
+                line = raw_line.strip()
                 if not line:
                     continue
                     
                 # Check if this is a header or a numbered point
-                if re.match(r'^\d+\.', line):
+                if _NUMBERED_POINT_RE.match(line):
                     # This is a numbered point
-                    print(f"\n  {line}")
+                    parts.append(f"\n  {line}")
                 elif ':' in line:
                     # This might be a header
-                    print(f"\n{line}")
+                    parts.append(f"\n{line}")
                 else:
                     # Regular text
-                    print(f"  {line}")
+                    parts.append(f"  {line}")
             
-            if 'timestamp' in ai_analysis:
-                timestamp = datetime.fromisoformat(ai_analysis['timestamp'])
-                print(f"\nAnalysis generated: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
+            # Rows stored before _display_ts existed only carry the ISO timestamp
+            display_ts = data.get('_display_ts')
+            if not display_ts and 'timestamp' in data:
+                display_ts = datetime.fromisoformat(data['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+            if display_ts:
+                parts.append(f"\n{generated_label} generated: {display_ts}")
         else:
-            print("No AI analysis data available.")
+            parts.append(f"No {label} data available.")
         
-        print("="*60)
+        parts.append(_BANNER)
+        return parts
+    
+    def _format_ai_analysis(self, ai_analysis: Dict[str, Any]) -> List[str]:
+        """Output lines for an AI symptom analysis"""
+        return self._format_structured(ai_analysis, _HEADER_ANALYSIS, 'analysis', "analysis", "AI analysis",
+                                       "Analysis")
+    
+    def _format_treatment_plan(self, treatment_plan: Dict[str, Any]) -> List[str]:
+        """Output lines for an AI treatment plan"""
+        return self._format_structured(treatment_plan, _HEADER_PLAN, 'treatment_plan', "treatment plan",
+                                       "treatment plan", "Plan")
+    
+    def display_ai_analysis(self, ai_analysis: Dict[str, Any]):
+        """Display AI analysis in a structured way"""
+        self._write_lines(self._format_ai_analysis(ai_analysis))
     
     def display_treatment_plan(self, treatment_plan: Dict[str, Any]):
         """Display treatment plan in a structured way"""
-        print("\n" + "="*60)
-        print(" "*20 + "AI TREATMENT PLAN")
-        print("="*60)
-        
-        if 'error' in treatment_plan:
-            print(f"Error generating treatment plan: {treatment_plan['error']}")
-            return
-            
-        if 'treatment_plan' in treatment_plan:
-            # Format the treatment plan text
-            plan_text = treatment_plan['treatment_plan']
-            
-            # Try to structure the output by looking for numbered points
-            import re
-            
-            # Split by lines
-            lines = plan_text.strip().split('\n')
-            
-            # Print each line with proper formatting
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Check if this is a header or a numbered point
-                if re.match(r'^\d+\.', line):
-                    # This is a numbered point
-                    print(f"\n  {line}")
-                elif ':' in line:
-                    # This might be a header
-                    print(f"\n{line}")
-                else:
-                    # Regular text
-                    print(f"  {line}")
-            
-            if 'timestamp' in treatment_plan:
-                timestamp = datetime.fromisoformat(treatment_plan['timestamp'])
-                print(f"\nPlan generated: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
-        else:
-            print("No treatment plan data available.")
-        
-        print("="*60)
+        self._write_lines(self._format_treatment_plan(treatment_plan))
     
     def run(self):
         """Main program loop"""
         while True:
             choice = self.display_menu()
-
-            if choice == '1':  # Patient Management
-                self.handle_patient_management()
-            elif choice == '2':  # Appointment Management
-                self.handle_appointment_management()
-            elif choice == '3':  # Treatment Management
-                self.handle_treatment_management()
-            elif choice == '4':  # Medical History
-                self.handle_medical_history()
-            elif choice == '5':
+            if choice == '5':
                 print("Goodbye!")
                 break
+            
+            action = self._main_actions.get(choice)
+            if action:
+                action()
             else:
                 print("Invalid choice. Please try again.")
     
-    def handle_patient_management(self):
-        """Handle patient management menu interactions"""
+    def _run_submenu(self, show_menu, actions: Dict[str, Any], exit_choice: str):
+        """Show a submenu until its exit choice is picked, dispatching the other choices"""
         while True:
-            sub_choice = self.patient_management_menu()
-            if sub_choice == '1':
-                patient_data = self.get_patient_data()
-                if self.service.add_patient(patient_data):
-                    print("Patient added successfully!")
-                else:
-                    print("Failed to add patient.")
-            elif sub_choice == '2':
-                patient_id = int(input("Enter patient ID: "))
-                patient = self.service.get_patient(patient_id)
-                if patient:
-                    print("\nPatient Details:")
-                    for key, value in patient.items():
-                        print(f"{key}: {value}")
-                else:
-                    print("Patient not found.")
-            elif sub_choice == '3':
-                patient_id = int(input("Enter patient ID to update: "))
-                patient = self.service.get_patient(patient_id)
-                if patient:
-                    print("\nCurrent patient details:")
-                    for key, value in patient.items():
-                        print(f"{key}: {value}")
-                    print("\nEnter new values (press Enter to keep current value):")
-                    update_data = {}
-                    for field in ['first_name', 'last_name', 'dob', 'phone', 'email']:
-                        new_value = input(f"New {field}: ")
-                        if new_value:
-                            update_data[field] = new_value
-                    if self.service.update_patient(patient_id, update_data):
-                        print("Patient updated successfully!")
-                    else:
-                        print("Failed to update patient.")
-                else:
-                    print("Patient not found.")
-            elif sub_choice == '4':
-                patient_id = int(input("Enter patient ID to delete: "))
-                if self.service.delete_patient(patient_id):
-                    print("Patient deleted successfully!")
-                else:
-                    print("Failed to delete patient or patient not found.")
-            elif sub_choice == '5':
-                patients = self.service.list_patients()
-                if patients:
-                    print("\nAll Patients:")
-                    for patient in patients:
-                        print(f"\nID: {patient['id']}")
-                        print(f"Name: {patient['first_name']} {patient['last_name']}")
-                        print(f"DOB: {patient['dob']}")
-                        print(f"Phone: {patient['phone']}")
-                        print(f"Email: {patient['email']}")
-                else:
-                    print("No patients found.")
-            elif sub_choice == '6':
+            sub_choice = show_menu()
+            if sub_choice == exit_choice:
                 break
+            action = actions.get(sub_choice)
+            if action:
+                action()
+    
+    def handle_patient_management(self):
+        """Handle patient management menu interactions"""
+        self._run_submenu(self.patient_management_menu, self._patient_actions, '7')
+    
+    def _add_patient(self):
+        """Prompt for and add a new patient"""
+        patient_data = self.get_patient_data()
+        if self.service.add_patient(patient_data):
+            print("Patient added successfully!")
+        else:
+            print("Failed to add patient.")
+    
+    def _view_patient(self):
+        """Show one patient's details"""
+        patient_id = int(input("Enter patient ID: "))
+        patient = self.service.get_patient(patient_id)
+        if patient:
+            print("\nPatient Details:")
+            for key, value in patient.items():
+                print(f"{key}: {value}")
+        else:
+            print("Patient not found.")
+    
+    def _update_patient(self):
+        """Prompt for and apply changes to a patient"""
+        patient_id = int(input("Enter patient ID to update: "))
+        patient = self.service.get_patient(patient_id)
+        if patient:
+            print("\nCurrent patient details:")
+            for key, value in patient.items():
+                print(f"{key}: {value}")
+            print("\nEnter new values (press Enter to keep current value):")
+            # Blank or whitespace-only answers keep the current value
+            update_data = {
+                field: new_value
+                for field in ('first_name', 'last_name', 'dob', 'phone', 'email')
+                if (new_value := input(f"New {field}: ").strip())
+            }
+            if self.service.update_patient(patient_id, update_data):
+                print("Patient updated successfully!")
+            else:
+                print("Failed to update patient.")
+        else:
+            print("Patient not found.")
+    
+    def _delete_patient(self):
+        """Delete a patient by ID"""
+        patient_id = int(input("Enter patient ID to delete: "))
+        if self.service.delete_patient(patient_id):
+            print("Patient deleted successfully!")
+        else:
+            print("Failed to delete patient or patient not found.")
+    
+    def _list_patients(self):
+        """List every patient"""
+        patients = self.service.list_patients()
+        if patients:
+            lines = ["\nAll Patients:"]
+            for patient in patients:
+                lines.append(
+                    f"\nID: {patient['id']}\n"
+                    f"Name: {patient['first_name']} {patient['last_name']}\n"
+                    f"DOB: {patient['dob']}\n"
+                    f"Phone: {patient['phone']}\n"
+                    f"Email: {patient['email']}"
+                )
+            self._write_lines(lines)
+        else:
+            print("No patients found.")
+    
+    def _view_dashboard(self):
+        """Show a patient with their upcoming appointments, recent treatments and medical history"""
+        patient_id = int(input("Enter patient ID: "))
+        dashboard = self.service.get_patient_dashboard(patient_id)
+        if not dashboard:
+            print("Patient not found.")
+            return
+        
+        lines = [
+            f"\n=== {dashboard['first_name']} {dashboard['last_name']} (ID: {dashboard['id']}) ===",
+            f"DOB: {dashboard['dob']}  Phone: {dashboard['phone']}  Email: {dashboard['email']}",
+            "\nUpcoming Appointments:"
+        ]
+        lines.extend(
+            f"  {appt['appointment_date']}  {appt['purpose']} ({appt['status']})"
+            for appt in dashboard['appointments']
+        )
+        if not dashboard['appointments']:
+            lines.append("  None")
+        
+        lines.append("\nRecent Treatments:")
+        lines.extend(
+            f"  {treatment['created_at']}  {treatment['condition']} ({treatment['status']})"
+            for treatment in dashboard['treatments']
+        )
+        if not dashboard['treatments']:
+            lines.append("  None")
+        
+        lines.append("\nRecent Medical History:")
+        lines.extend(
+            f"  {record['visit_date']}  {record['diagnosis']}"
+            for record in dashboard['medical_history']
+        )
+        if not dashboard['medical_history']:
+            lines.append("  None")
+        self._write_lines(lines)
     
     def handle_appointment_management(self):
         """Handle appointment management menu interactions"""
-        while True:
-            sub_choice = self.appointment_management_menu()
-            if sub_choice == '1':
-                patient_id = int(input("Enter patient ID: "))
-                if not self.service.get_patient(patient_id):
-                    print("Patient not found.")
-                    continue
-                    
-                appointment_data = self.get_appointment_data()
-                if self.service.schedule_appointment(patient_id, appointment_data):
-                    print("Appointment scheduled successfully!")
-                else:
-                    print("Failed to schedule appointment.")
-            elif sub_choice == '2':
-                patient_id = int(input("Enter patient ID: "))
-                appointments = self.service.get_patient_appointments(patient_id)
-                if appointments:
-                    print("\nAppointments:")
-                    for appt in appointments:
-                        print(f"\nID: {appt['id']}")
-                        print(f"Date: {appt['appointment_date']}")
-                        print(f"Purpose: {appt['purpose']}")
-                        print(f"Status: {appt['status']}")
-                else:
-                    print("No appointments found.")
-            elif sub_choice == '3':
-                break
+        self._run_submenu(self.appointment_management_menu, self._appointment_actions, '3')
+    
+    def _schedule_appointment(self):
+        """Schedule an appointment for an existing patient"""
+        patient_id = int(input("Enter patient ID: "))
+        if not self.service.patient_exists(patient_id):
+            print("Patient not found.")
+            return
+            
+        appointment_data = self.get_appointment_data()
+        if self.service.schedule_appointment(patient_id, appointment_data):
+            print("Appointment scheduled successfully!")
+        else:
+            print("Failed to schedule appointment.")
+    
+    def _view_appointments(self):
+        """List a patient's appointments"""
+        patient_id = int(input("Enter patient ID: "))
+        appointments = self.service.get_patient_appointments(patient_id)
+        if appointments:
+            lines = ["\nAppointments:"]
+            for appt in appointments:
+                lines.append(
+                    f"\nID: {appt['id']}\n"
+                    f"Date: {appt['appointment_date']}\n"
+                    f"Purpose: {appt['purpose']}\n"
+                    f"Status: {appt['status']}"
+                )
+            self._write_lines(lines)
+        else:
+            print("No appointments found.")
     
     def handle_treatment_management(self):
         """Handle treatment management menu interactions"""
-        while True:
-            sub_choice = self.treatment_management_menu()
-            if sub_choice == '1':
-                patient_id = int(input("Enter patient ID: "))
-                if not self.service.get_patient(patient_id):
-                    print("Patient not found.")
-                    continue
-                    
-                treatment_data = self.get_treatment_data()
-                print("\nProcessing AI analysis... please wait.")
-                
-                # Get back the success status and AI responses
-                success, ai_analysis, treatment_plan = self.service.add_treatment(patient_id, treatment_data)
+        self._run_submenu(self.treatment_management_menu, self._treatment_actions, '3')
+    
+    def _add_treatment(self):
+        """Add a treatment and show its AI analysis and plan"""
+        patient_id = int(input("Enter patient ID: "))
+        if not self.service.patient_exists(patient_id):
+            print("Patient not found.")
+            return
+            
+        treatment_data = self.get_treatment_data()
+        print("\nProcessing AI analysis... please wait.")
+        
+        # Get back the success status and AI responses
+        success, ai_analysis, treatment_plan = self.service.add_treatment(patient_id, treatment_data)
+        
+        if success:
+            print("Treatment added successfully!")
+            
+            # Display the AI responses in a structured way
+            self.display_ai_analysis(ai_analysis)
+            self.display_treatment_plan(treatment_plan)
+        else:
+            print("Failed to add treatment.")
+    
+    def _view_treatments(self):
+        """List a patient's treatments with their AI results"""
+        patient_id = int(input("Enter patient ID: "))
+        treatments = self.service.get_patient_treatments(patient_id)
+        if treatments:
+            lines = ["\nTreatments:"]
+            for treatment in treatments:
+                lines.append(
+                    f"\n{'='*50}\n"
+                    f"ID: {treatment['id']}\n"
+                    f"Condition: {treatment['condition']}\n"
+                    f"Symptoms: {treatment['symptoms']}\n"
+                    f"Status: {treatment['status']}\n"
+                    f"Created: {treatment['created_at']}"
+                )
                 
-                if success:
-                    print("Treatment added successfully!")
-                    
-                    # Display the AI responses in a structured way
-                    self.display_ai_analysis(ai_analysis)
-                    self.display_treatment_plan(treatment_plan)
-                else:
-                    print("Failed to add treatment.")
-            elif sub_choice == '2':
-                patient_id = int(input("Enter patient ID: "))
-                treatments = self.service.get_patient_treatments(patient_id)
-                if treatments:
-                    print("\nTreatments:")
-                    for treatment in treatments:
-                        print(f"\n{'='*50}")
-                        print(f"ID: {treatment['id']}")
-                        print(f"Condition: {treatment['condition']}")
-                        print(f"Symptoms: {treatment['symptoms']}")
-                        print(f"Status: {treatment['status']}")
-                        print(f"Created: {treatment['created_at']}")
+                if treatment['ai_analysis']:
+                    lines.extend(self._format_ai_analysis(treatment['ai_analysis']))
                         
-                        if treatment['ai_analysis']:
-                            self.display_ai_analysis(treatment['ai_analysis'])
-                                
-                        if treatment['treatment_plan']:
-                            self.display_treatment_plan(treatment['treatment_plan'])
-                        
-                        print(f"{'='*50}")
-                else:
-                    print("No treatments found.")
-            elif sub_choice == '3':
-                break
+                if treatment['treatment_plan']:
+                    lines.extend(self._format_treatment_plan(treatment['treatment_plan']))
+                
+                lines.append(f"{'='*50}")
+            self._write_lines(lines)
+        else:
+            print("No treatments found.")
     
     def handle_medical_history(self):
         """Handle medical history menu interactions"""
-        while True:
-            sub_choice = self.medical_history_menu()
-            if sub_choice == '1':
-                patient_id = int(input("Enter patient ID: "))
-                if not self.service.get_patient(patient_id):
-                    print("Patient not found.")
-                    continue
-                    
-                history_data = self.get_medical_history_data()
-                if self.service.add_medical_history(patient_id, history_data):
-                    print("Medical history added successfully!")
-                else:
-                    print("Failed to add medical history.")
-            elif sub_choice == '2':
-                patient_id = int(input("Enter patient ID: "))
-                history = self.service.get_patient_medical_history(patient_id)
-                if history:
-                    print("\nMedical History:")
-                    for record in history:
-                        print(f"\nVisit Date: {record['visit_date']}")
-                        print(f"Diagnosis: {record['diagnosis']}")
-                        print(f"Treatment: {record['treatment']}")
-                        print(f"Notes: {record['notes']}")
-                else:
-                    print("No medical history found.")
-            elif sub_choice == '3':
-                break
+        self._run_submenu(self.medical_history_menu, self._medical_history_actions, '3')
+    
+    def _add_medical_history(self):
+        """Add a medical history record for an existing patient"""
+        patient_id = int(input("Enter patient ID: "))
+        if not self.service.patient_exists(patient_id):
+            print("Patient not found.")
+            return
+            
+        history_data = self.get_medical_history_data()
+        if self.service.add_medical_history(patient_id, history_data):
+            print("Medical history added successfully!")
+        else:
+            print("Failed to add medical history.")
+    
+    def _view_medical_history(self):
+        """List a patient's medical history"""
+        patient_id = int(input("Enter patient ID: "))
+        history = self.service.get_patient_medical_history(patient_id)
+        if history:
+            lines = ["\nMedical History:"]
+            for record in history:
+                lines.append(
+                    f"\nVisit Date: {record['visit_date']}\n"
+                    f"Diagnosis: {record['diagnosis']}\n"
+                    f"Treatment: {record['treatment']}\n"
+                    f"Notes: {record['notes']}"
+                )
+            self._write_lines(lines)
+        else:
+            print("No medical history found.")
 
 def main():
     """Main program entry point"""
+    db_connection = None
     try:
         # Load configurations
         db_config = ConfigManager.get_db_config()
@@ -1206,8 +1774,9 @@ def main():
             print("Please check your environment variables or config.json file.")
             return
         
-        # Setup database connection
-        db_connection = DatabaseConnection(db_config)
+        # Setup the connection pool; the CLI works one request at a time, so one warm
+        # connection is enough up front and the rest are opened only under load
+        db_connection = DatabaseConnection(db_config, min_connections=1, max_connections=8)
         
         # Setup database manager
         db_manager = DatabaseManager(db_connection)
@@ -1244,8 +1813,8 @@ def main():
         logger.error(f"Application error: {str(e)}")
         print(f"An error occurred: {str(e)}")
     finally:
-        # Cleanup resources
-        if 'db_connection' in locals():
+        # Cleanup resources: closes every pooled connection
+        if db_connection:
             db_connection.close()
 
 if __name__ == "__main__":
@@ -2,6 +2,10 @@
 Stylesheet definitions for the PyQt6 Patient Management System with green and black theme
 """
 
+# Object names that scope the form and treatment detail rules inside the one application stylesheet
+PATIENT_FORM_NAME = "patientForm"
+TREATMENT_DETAILS_NAME = "treatmentDetails"
+
 # Main application style
 MAIN_STYLE = """
 QMainWindow {
@@ -78,7 +82,7 @@ QLineEdit, QTextEdit, QDateEdit, QDateTimeEdit, QComboBox {
     selection-color: white;
 }
 
-QTableWidget {
+QTableView {
     alternate-background-color: #0f0f0f;
     gridline-color: #1e1e1e;
     background-color: #121212;
@@ -87,7 +91,7 @@ QTableWidget {
     selection-color: white;
 }
 
-QTableWidget::item {
+QTableView::item {
     padding: 5px;
 }
 
@@ -193,26 +197,26 @@ QDialog QDialogButtonBox {
 }
 """
 
-# Patient form style
+# Patient form style (dialogs named PATIENT_FORM_NAME)
 PATIENT_FORM_STYLE = """
-QDialog {
+QDialog#patientForm {
     background-color: #121212;
     color: #a0ffa0;
 }
 
-QLabel {
+QDialog#patientForm QLabel {
     font-weight: bold;
     color: #a0ffa0;
 }
 
-QPushButton {
+QDialog#patientForm QPushButton {
     min-width: 100px;
 }
 """
 
-# Treatment detail style
+# Treatment detail style (the text edit named TREATMENT_DETAILS_NAME)
 TREATMENT_DETAIL_STYLE = """
-QTextEdit {
+QTextEdit#treatmentDetails {
     font-family: 'Segoe UI', Arial, sans-serif;
     border: 1px solid #1e1e1e;
     border-radius: 4px;
@@ -221,15 +225,15 @@ QTextEdit {
     color: #a0ffa0;
 }
 
-QTextEdit h2, QTextEdit h3 {
+QTextEdit#treatmentDetails h2, QTextEdit#treatmentDetails h3 {
     color: #50ff50;
 }
 
-QTextEdit b {
+QTextEdit#treatmentDetails b {
     color: #50ff50;
 }
 
-QTextEdit div {
+QTextEdit#treatmentDetails div {
     background-color: #121212 !important;
     color: #a0ffa0 !important;
     padding: 10px;
@@ -237,4 +241,8 @@ QTextEdit div {
     border: 1px solid #1e1e1e;
     margin: 5px 0;
 }
-""" 
\ No newline at end of file
+"""
+
+# Everything combined, set once on the main window so Qt parses the rules a single time
+# instead of again for every dialog that is opened
+APP_STYLE = MAIN_STYLE + PATIENT_FORM_STYLE + TREATMENT_DETAIL_STYLE